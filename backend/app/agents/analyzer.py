@@ -2,6 +2,7 @@ import json
 import logging
 import re
 import os
+import threading
 from datetime import datetime
 from typing import Optional, Dict, List
 from openai import OpenAI
@@ -21,26 +22,67 @@ class RateLimitException(Exception):
     """Exception raised when rate limit is hit - can be retried with delay"""
     pass
 
-def _create_ollama_http_client():
-    """Create httpx client with timeout for Ollama"""
+# Named keep-alive pools for Ollama/vLLM: pool name -> httpx client
+_ollama_http_clients: Dict[str, httpx.Client] = {}
+_ollama_http_client_lock = threading.Lock()
+
+def _new_ollama_http_client() -> httpx.Client:
+    """Create an httpx client with timeout for Ollama/vLLM"""
     return httpx.Client(
         timeout=httpx.Timeout(300.0, connect=10.0),  # 5 min timeout for slow models, 10s connect
         limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
     )
 
+def _get_ollama_http_client(pool: str = "default"):
+    """Get the process-wide httpx client with timeout for Ollama/vLLM
+    
+    httpx.Client is thread-safe, so analyzers of one pool share a keep-alive
+    connection pool instead of opening new connections per CodeAnalyzer.
+    The indexer uses its own pool, so long analysis calls can't take every
+    connection from search queries and its reconnects don't affect them.
+    """
+    client = _ollama_http_clients.get(pool)
+    if client is None:
+        with _ollama_http_client_lock:
+            client = _ollama_http_clients.get(pool)
+            if client is None:
+                client = _new_ollama_http_client()
+                _ollama_http_clients[pool] = client
+    return client
+
 
 class CodeAnalyzer:
     """AI Agent for code analysis with support for multiple LLM providers"""
     
-    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None, http_pool: str = "default"):
         self.provider = provider or settings.LLM_PROVIDER
         self.model = model or settings.LLM_MODEL
+        self.http_pool = http_pool  # Ollama/vLLM connection pool (see _get_ollama_http_client)
+        self._own_http_client: Optional[httpx.Client] = None  # Set by reconnect()
         self.client = None
         self.db_provider = None
         self.static_analyzer = StaticMetricsAnalyzer()
         
         self._init_client()
     
+    def reconnect(self):
+        """Reinitialize the LLM client on fresh connections (and the latest provider from DB)
+        
+        The analyzer switches to its own new Ollama/vLLM pool; the shared pool stays
+        open for other analyzers, and a pool from an earlier reconnect is closed.
+        """
+        old_http_client = self._own_http_client
+        self._own_http_client = _new_ollama_http_client()
+        self.client = None
+        self.db_provider = None
+        self._init_client()
+        if old_http_client is not None:
+            old_http_client.close()
+    
+    def _get_http_client(self) -> httpx.Client:
+        """httpx client for Ollama/vLLM: the analyzer's own after reconnect(), else the shared pool"""
+        return self._own_http_client or _get_ollama_http_client(self.http_pool)
+    
     def _init_client(self):
         """Initialize LLM client based on provider"""
         # Try to get default provider from database first
@@ -86,7 +128,7 @@ class CodeAnalyzer:
             self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         elif self.provider == "ollama":
             # Ollama uses OpenAI-compatible API
-            http_client = _create_ollama_http_client()
+            http_client = self._get_http_client()
             self.client = OpenAI(
                 base_url=f"{settings.OLLAMA_URL}/v1",
                 api_key="ollama",  # Ollama doesn't require real API key
@@ -98,7 +140,7 @@ class CodeAnalyzer:
         elif self.provider == "vllm":
             # vLLM uses OpenAI-compatible API
             vllm_url = getattr(settings, 'VLLM_URL', 'http://localhost:8000')
-            http_client = _create_ollama_http_client()  # Same timeout settings work for vLLM
+            http_client = self._get_http_client()  # Same timeout settings work for vLLM
             self.client = OpenAI(
                 base_url=f"{vllm_url}/v1",
                 api_key="vllm",  # vLLM doesn't require real API key
@@ -118,8 +160,8 @@ class CodeAnalyzer:
         elif provider.name == "ollama":
             base_url = provider.base_url or settings.OLLAMA_URL
             logger.info(f"Connecting to Ollama at: {base_url}")
-            # Create new httpx client for this instance (thread-safe)
-            http_client = _create_ollama_http_client()
+            # Shared keep-alive httpx client (thread-safe)
+            http_client = self._get_http_client()
             self.client = OpenAI(
                 base_url=f"{base_url}/v1",
                 api_key="ollama",
@@ -180,8 +222,8 @@ class CodeAnalyzer:
             # vLLM uses OpenAI-compatible API
             base_url = provider.base_url or "http://localhost:8000"
             logger.info(f"Connecting to vLLM at: {base_url}")
-            # Create new httpx client for this instance (thread-safe)
-            http_client = _create_ollama_http_client()  # Same timeout settings work for vLLM
+            # Shared keep-alive httpx client (thread-safe)
+            http_client = self._get_http_client()  # Same timeout settings work for vLLM
             self.client = OpenAI(
                 base_url=f"{base_url}/v1",
                 api_key="vllm",  # vLLM doesn't require real API key
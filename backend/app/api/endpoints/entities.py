@@ -7,28 +7,21 @@ import hashlib
 
 from app.core.database import get_db
 from app.models.database import Entity, Analysis, File, Dependency
-from app.api.models.schemas import EntityResponse, AnalysisResponse, DependencyResponse, SimilarCodeResponse
+from app.api.models.schemas import EntityResponse, AnalysisResponse, DependencyResponse, SimilarCodeResponse, ComplexityClass
 from sqlalchemy import func
 
 router = APIRouter(prefix="/api/entities", tags=["entities"])
 
+# 'ComplexityClass.LINEAR' -> 'O(n)', etc.
+_ENUM_COMPLEXITY = {f'ComplexityClass.{complexity.name}': complexity.value for complexity in ComplexityClass}
+
 
 def _convert_complexity(complexity: Optional[str]) -> str:
     """Convert ComplexityClass.* enum string to O(1), O(n), etc."""
     if not complexity:
         return "O(n)"
     if complexity.startswith('ComplexityClass.'):
-        complexity_map = {
-            'ComplexityClass.CONSTANT': 'O(1)',
-            'ComplexityClass.LOGARITHMIC': 'O(log n)',
-            'ComplexityClass.LINEAR': 'O(n)',
-            'ComplexityClass.LINEARITHMIC': 'O(n log n)',
-            'ComplexityClass.QUADRATIC': 'O(n^2)',
-            'ComplexityClass.CUBIC': 'O(n^3)',
-            'ComplexityClass.EXPONENTIAL': 'O(2^n)',
-            'ComplexityClass.FACTORIAL': 'O(n!)'
-        }
-        return complexity_map.get(complexity, 'O(n)')
+        return _ENUM_COMPLEXITY.get(complexity, 'O(n)')
     return complexity
 
 
@@ -98,13 +91,13 @@ def get_entity_analysis(entity_id: int, db: Session = Depends(get_db)):
         complexity=_convert_complexity(analysis.complexity),
         complexity_explanation=analysis.complexity_explanation,
         complexity_numeric=analysis.complexity_numeric,
-        solid_violations=analysis.solid_violations or [],
-        design_patterns=analysis.design_patterns or [],
+        solid_violations=analysis.solid_violations,
+        design_patterns=analysis.design_patterns,
         ddd_role=analysis.ddd_role,
         mvc_role=analysis.mvc_role,
         is_testable=analysis.is_testable,
         testability_score=analysis.testability_score,
-        testability_issues=analysis.testability_issues or [],
+        testability_issues=analysis.testability_issues,
         entity=entity_response,
         # Extended metrics
         lines_of_code=analysis.lines_of_code,
@@ -116,10 +109,10 @@ def get_entity_analysis(entity_id: int, db: Session = Depends(get_db)):
         cohesion_score=analysis.cohesion_score,
         afferent_coupling=analysis.afferent_coupling,
         efferent_coupling=analysis.efferent_coupling,
-        n_plus_one_queries=analysis.n_plus_one_queries or [],
+        n_plus_one_queries=analysis.n_plus_one_queries,
         space_complexity=analysis.space_complexity,
         hot_path_detected=analysis.hot_path_detected,
-        security_issues=analysis.security_issues or [],
+        security_issues=analysis.security_issues,
         hardcoded_secrets=analysis.hardcoded_secrets or [],
         insecure_dependencies=analysis.insecure_dependencies or [],
         is_god_object=analysis.is_god_object,
@@ -242,13 +235,13 @@ def get_entity_dependencies(entity_id: int, db: Session = Depends(get_db)):
                         complexity=dep_analysis.complexity,
                         complexity_explanation=dep_analysis.complexity_explanation,
                         complexity_numeric=dep_analysis.complexity_numeric,
-                        solid_violations=dep_analysis.solid_violations or [],
-                        design_patterns=dep_analysis.design_patterns or [],
+                        solid_violations=dep_analysis.solid_violations,
+                        design_patterns=dep_analysis.design_patterns,
                         ddd_role=dep_analysis.ddd_role,
                         mvc_role=dep_analysis.mvc_role,
                         is_testable=dep_analysis.is_testable,
                         testability_score=dep_analysis.testability_score,
-                        testability_issues=dep_analysis.testability_issues or [],
+                        testability_issues=dep_analysis.testability_issues,
                         entity=depends_on_entity
                     )
         
@@ -355,13 +348,13 @@ def get_similar_code(
                     complexity=_convert_complexity(analysis_obj.complexity),
                     complexity_explanation=analysis_obj.complexity_explanation,
                     complexity_numeric=analysis_obj.complexity_numeric,
-                    solid_violations=analysis_obj.solid_violations or [],
-                    design_patterns=analysis_obj.design_patterns or [],
+                    solid_violations=analysis_obj.solid_violations,
+                    design_patterns=analysis_obj.design_patterns,
                     ddd_role=analysis_obj.ddd_role,
                     mvc_role=analysis_obj.mvc_role,
                     is_testable=analysis_obj.is_testable,
                     testability_score=analysis_obj.testability_score,
-                    testability_issues=analysis_obj.testability_issues or [],
+                    testability_issues=analysis_obj.testability_issues,
                     entity=EntityResponse(
                         id=entity_obj.id,
                         type=entity_obj.type,
@@ -619,13 +612,13 @@ def search_similar_code(
                                 complexity=_convert_complexity(analysis1.complexity),
                                 complexity_explanation=getattr(analysis1, 'complexity_explanation', None),
                                 complexity_numeric=analysis1.complexity_numeric,
-                                solid_violations=analysis1.solid_violations or [],
-                                design_patterns=analysis1.design_patterns or [],
+                                solid_violations=analysis1.solid_violations,
+                                design_patterns=analysis1.design_patterns,
                                 ddd_role=analysis1.ddd_role,
                                 mvc_role=analysis1.mvc_role,
                                 is_testable=analysis1.is_testable,
                                 testability_score=analysis1.testability_score,
-                                testability_issues=analysis1.testability_issues or [],
+                                testability_issues=analysis1.testability_issues,
                                 entity=entity1_resp
                             )
                         
@@ -637,13 +630,13 @@ def search_similar_code(
                                 complexity=_convert_complexity(analysis2.complexity),
                                 complexity_explanation=getattr(analysis2, 'complexity_explanation', None),
                                 complexity_numeric=analysis2.complexity_numeric,
-                                solid_violations=analysis2.solid_violations or [],
-                                design_patterns=analysis2.design_patterns or [],
+                                solid_violations=analysis2.solid_violations,
+                                design_patterns=analysis2.design_patterns,
                                 ddd_role=analysis2.ddd_role,
                                 mvc_role=analysis2.mvc_role,
                                 is_testable=analysis2.is_testable,
                                 testability_score=analysis2.testability_score,
-                                testability_issues=analysis2.testability_issues or [],
+                                testability_issues=analysis2.testability_issues,
                                 entity=entity2_resp
                             )
                         
@@ -7,14 +7,11 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import json
 import asyncio
-import sys
 import os
 from typing import Dict, Any
 
-# Add mcp_server to path
-# mcp_server is mounted at /app/mcp_server in backend container (via volume mount)
-sys.path.insert(0, '/app/mcp_server')
-
+# mcp_server is mounted at /app/mcp_server in the backend container (via volume mount),
+# so it is importable as a package from the /app working directory
 from mcp_server.tools import CodeRAGTools
 from mcp_server.resources import CodeRAGResources
 from app.core.database import get_db
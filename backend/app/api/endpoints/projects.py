@@ -7,6 +7,7 @@ from app.core.database import get_db
 from app.models.database import Project, File, Entity, Analysis
 from app.api.models.schemas import ProjectCreate, ProjectResponse, ProjectProgressResponse
 from app.services.indexer import IndexingService
+from app.services.search_service import SearchService
 from app.core.celery_app import celery_app
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
@@ -266,6 +267,7 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     
     db.delete(project)
     db.commit()
+    SearchService.forget_project(project_id)
     
     return None
 
@@ -15,6 +15,14 @@ class ComplexityClass(str, Enum):
     FACTORIAL = "O(n!)"
 
 
+# Numeric rank stored in Analysis.complexity_numeric, keyed by both the value ("O(n)")
+# and the str() of the member ("ComplexityClass.LINEAR") found in older rows
+COMPLEXITY_NUMERIC = {
+    **{complexity.value: rank for rank, complexity in enumerate(ComplexityClass, start=1)},
+    **{f"ComplexityClass.{complexity.name}": rank for rank, complexity in enumerate(ComplexityClass, start=1)},
+}
+
+
 class SOLIDPrinciple(str, Enum):
     SRP = "Single Responsibility Principle"
     OCP = "Open/Closed Principle"
@@ -7,7 +7,8 @@ engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_size=10,
-    max_overflow=20
+    max_overflow=20,
+    pool_recycle=1800  # Replace connections older than 30 minutes before server/proxy timeouts drop them
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -25,11 +26,12 @@ def get_db():
 
 
 def init_db():
-    """Initialize database with pgvector extension"""
+    """Initialize database with pgvector and pg_trgm extensions"""
     from sqlalchemy import text
     
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         conn.commit()
     
     Base.metadata.create_all(bind=engine)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Float, Boolean, Index
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, JSON, Float, Boolean, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -60,6 +61,8 @@ class File(Base):
     __table_args__ = (
         Index('idx_file_project_path', 'project_id', 'path'),
         Index('idx_file_hash', 'hash'),
+        # Covers the project -> files step of search joins (index-only scan)
+        Index('idx_file_project_covering', 'project_id', postgresql_include=['id']),
     )
 
 
@@ -75,6 +78,7 @@ class Entity(Base):
     visibility = Column(String(20))  # public, private, protected
     code = Column(Text, nullable=False)
     full_qualified_name = Column(Text)  # e.g., "ClassName.method_name" (can be very long)
+    is_enum_case = Column(Boolean, nullable=True, default=False)  # constant with "::" in FQN (enum case value)
     
     file = relationship("File", back_populates="entities")
     analysis = relationship("Analysis", back_populates="entity", uselist=False, cascade="all, delete-orphan")
@@ -86,8 +90,15 @@ class Entity(Base):
     
     __table_args__ = (
         Index('idx_entity_file_type', 'file_id', 'type'),
+        # Covers the files -> entities step of search joins, including type filters
+        Index('idx_entity_file_covering', 'file_id', postgresql_include=['id', 'type', 'is_enum_case']),
         Index('idx_entity_name', 'name'),
         Index('idx_entity_fqn', 'full_qualified_name'),
+        Index('idx_entity_enum_case', 'is_enum_case'),
+        # Trigram indexes back the ILIKE '%keyword%' matching in keyword search
+        Index('idx_entity_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_entity_fqn_trgm', 'full_qualified_name', postgresql_using='gin',
+              postgresql_ops={'full_qualified_name': 'gin_trgm_ops'}),
     )
 
 
@@ -104,23 +115,23 @@ class Analysis(Base):
     complexity_explanation = Column(Text, nullable=True)
     
     # SOLID violations
-    solid_violations = Column(JSON, default=list)
+    solid_violations = Column(JSONB, default=list, nullable=False, server_default=text("'[]'::jsonb"))
     
     # Architecture
-    design_patterns = Column(JSON, default=list)
+    design_patterns = Column(JSONB, default=list, nullable=False, server_default=text("'[]'::jsonb"))
     ddd_role = Column(String(100))
     mvc_role = Column(String(100))
     
     # Testability
     is_testable = Column(Boolean, nullable=False)
     testability_score = Column(Float, nullable=False)
-    testability_issues = Column(JSON, default=list)
+    testability_issues = Column(JSON, default=list, nullable=False, server_default=text("'[]'::json"))
     
     # For similarity detection
     code_fingerprint = Column(Text, nullable=False)
     
     # Embedding ID in Qdrant
-    embedding_id = Column(String(255))
+    embedding_id = Column(BigInteger)  # Qdrant point ID (same as entity.id)
     
     # Keywords for better semantic search (synonyms, related terms, etc.)
     keywords = Column(Text, nullable=True)  # Comma-separated or JSON array of keywords
@@ -139,19 +150,19 @@ class Analysis(Base):
     efferent_coupling = Column(Integer, default=0, nullable=True)  # исходящие зависимости
     
     # Performance metrics
-    n_plus_one_queries = Column(JSON, default=list, nullable=True)
+    n_plus_one_queries = Column(JSONB, default=list, nullable=False, server_default=text("'[]'::jsonb"))
     space_complexity = Column(String(50), default="O(1)", nullable=True)
     hot_path_detected = Column(Boolean, default=False, nullable=True)
     
     # Security metrics
-    security_issues = Column(JSON, default=list, nullable=True)
-    hardcoded_secrets = Column(JSON, default=list, nullable=True)
-    insecure_dependencies = Column(JSON, default=list, nullable=True)
+    security_issues = Column(JSONB, default=list, nullable=False, server_default=text("'[]'::jsonb"))
+    hardcoded_secrets = Column(JSONB, default=list, nullable=True)
+    insecure_dependencies = Column(JSONB, default=list, nullable=True)
     
     # Architecture metrics
     is_god_object = Column(Boolean, default=False, nullable=True)
     feature_envy_score = Column(Float, default=0.0, nullable=True)
-    data_clumps = Column(JSON, default=list, nullable=True)
+    data_clumps = Column(JSONB, default=list, nullable=True)
     long_parameter_list = Column(Boolean, default=False, nullable=True)
     
     entity = relationship("Entity", back_populates="analysis")
@@ -160,7 +171,16 @@ class Analysis(Base):
         Index('idx_analysis_complexity', 'complexity_numeric'),
         Index('idx_analysis_testable', 'is_testable', 'testability_score'),
         Index('idx_analysis_cyclomatic', 'cyclomatic_complexity'),
-        Index('idx_analysis_security', 'security_issues'),
+        Index('idx_analysis_security', 'security_issues', postgresql_using='gin',
+              postgresql_ops={'security_issues': 'jsonb_path_ops'}),
+        # GIN indexes for the SOLID (@>) and design pattern (?) filters in structured search
+        Index('idx_analysis_solid_gin', 'solid_violations', postgresql_using='gin',
+              postgresql_ops={'solid_violations': 'jsonb_path_ops'}),
+        Index('idx_analysis_patterns_gin', 'design_patterns', postgresql_using='gin'),
+        Index('idx_analysis_description_trgm', 'description', postgresql_using='gin',
+              postgresql_ops={'description': 'gin_trgm_ops'}),
+        Index('idx_analysis_keywords_trgm', 'keywords', postgresql_using='gin',
+              postgresql_ops={'keywords': 'gin_trgm_ops'}),
     )
 
 
@@ -176,5 +196,7 @@ class Dependency(Base):
     __table_args__ = (
         Index('idx_dependency_entity', 'entity_id'),
         Index('idx_dependency_name', 'depends_on_name'),
+        Index('idx_dependency_name_trgm', 'depends_on_name', postgresql_using='gin',
+              postgresql_ops={'depends_on_name': 'gin_trgm_ops'}),
     )
 
@@ -1,5 +1,5 @@
 """LLM Provider model for managing multiple providers"""
-from sqlalchemy import Column, Integer, String, JSON, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, JSON, Boolean, DateTime, Index
 from datetime import datetime
 from app.core.database import Base
 
@@ -18,4 +18,8 @@ class LLMProvider(Base):
     config = Column(JSON, default=dict)  # Additional provider-specific config
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
+    
+    __table_args__ = (
+        # Default provider lookup (is_default AND is_active)
+        Index('idx_llm_providers_default', 'is_default', postgresql_where=is_active.is_(True)),
+    )
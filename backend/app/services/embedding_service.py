@@ -1,5 +1,7 @@
 import logging
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
 from openai import OpenAI
 from sentence_transformers import SentenceTransformer
 from app.core.config import settings
@@ -10,6 +12,25 @@ logger = logging.getLogger(__name__)
 class EmbeddingService:
     """Service for generating embeddings"""
     
+    # Class-level cache: (model, text) -> embedding, for search queries
+    # (services are created per request, so the cache must outlive instances)
+    _query_cache: "OrderedDict[Tuple[str, str], Tuple[float, ...]]" = OrderedDict()
+    _query_cache_lock = threading.Lock()
+    QUERY_CACHE_SIZE = 1024
+    
+    # Local model, loaded once per process and shared by all instances
+    # (SentenceTransformer.encode is safe to call from several threads)
+    _local_model = None
+    _local_model_lock = threading.Lock()
+    
+    @classmethod
+    def _get_local_model(cls) -> SentenceTransformer:
+        if cls._local_model is None:
+            with cls._local_model_lock:
+                if cls._local_model is None:
+                    cls._local_model = SentenceTransformer('all-MiniLM-L6-v2')
+        return cls._local_model
+    
     def __init__(self):
         self.model_name = settings.EMBEDDING_MODEL
         self.use_local = settings.LLM_PROVIDER == "ollama" or not settings.OPENAI_API_KEY
@@ -17,7 +38,7 @@ class EmbeddingService:
         if self.use_local:
             # Use local model
             logger.info(f"Using local embedding model: {self.model_name}")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.model = self._get_local_model()
             self.dimension = 384
         else:
             # Use OpenAI
@@ -36,6 +57,28 @@ class EmbeddingService:
             )
             return response.data[0].embedding
     
+    def generate_query_embedding(self, text: str) -> List[float]:
+        """Generate embedding for a search query, reusing recent results
+        
+        Embeddings are deterministic per model and text, so repeated queries
+        skip the model call. Indexing uses generate_embedding directly, since
+        its texts are rarely repeated and would only evict queries.
+        """
+        model_key = 'local' if self.use_local else self.model_name
+        cache_key = (model_key, text)
+        with self._query_cache_lock:
+            cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                self._query_cache.move_to_end(cache_key)
+                return list(cached)
+        
+        embedding = self.generate_embedding(text)
+        with self._query_cache_lock:
+            self._query_cache[cache_key] = tuple(embedding)
+            if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
+    
     def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts"""
         if self.use_local:
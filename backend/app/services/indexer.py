@@ -5,10 +5,11 @@ import re
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, func
 
 from app.models.database import Project, File, Entity, Analysis, Dependency
+from app.api.models.schemas import COMPLEXITY_NUMERIC
 from app.parsers.code_parser import CodeParser
 from app.agents.analyzer import CodeAnalyzer
 from app.services.embedding_service import EmbeddingService
@@ -19,14 +20,26 @@ from app.core.celery_app import celery_app
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for IN (...) lists and Qdrant bulk deletes
+DELETE_BATCH_SIZE = 1000
+
+
+def _batched(items: List, size: int):
+    """Yield consecutive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class IndexingService:
     """Service for indexing code projects"""
     
+    # Ollama/vLLM connection pool used only by the indexer
+    LLM_HTTP_POOL = "indexing"
+    
     def __init__(self):
         self.parser = CodeParser()
         # Create analyzer fresh each time to get latest provider from DB
-        self.analyzer = CodeAnalyzer()
+        self.analyzer = CodeAnalyzer(http_pool=self.LLM_HTTP_POOL)
         self.embedding_service = EmbeddingService()
         self.qdrant = QdrantService()
     
@@ -257,12 +270,8 @@ class IndexingService:
                             # Delete old analysis BEFORE re-analyzing
                             old_analysis = entity.analysis
                             if old_analysis:
-                                if old_analysis.embedding_id:
-                                    try:
-                                        point_id = int(old_analysis.embedding_id)
-                                        self.qdrant.delete(point_id)
-                                    except (ValueError, TypeError):
-                                        pass
+                                if old_analysis.embedding_id is not None:
+                                    self.qdrant.delete(old_analysis.embedding_id)
                                 db.delete(old_analysis)
                                 db.commit()  # Commit deletion before re-analyzing
                             
@@ -322,7 +331,7 @@ class IndexingService:
                                             else:
                                                 wait_time = retry_delay * (attempt + 1)
                                                 try:
-                                                    self.analyzer = CodeAnalyzer()
+                                                    self.analyzer.reconnect()
                                                     logger.info(f"Reconnected to LLM provider: {self.analyzer.provider}")
                                                 except Exception as reconnect_error:
                                                     logger.error(f"Failed to reconnect to LLM: {reconnect_error}")
@@ -386,18 +395,6 @@ class IndexingService:
                                 
                                 # Save analysis to existing entity (reuse code from _process_entity)
                                 # This is the same logic as in _process_entity, but for existing entity
-                                # Define complexity map
-                                complexity_map = {
-                                    "O(1)": 1,
-                                    "O(log n)": 2,
-                                    "O(n)": 3,
-                                    "O(n log n)": 4,
-                                    "O(n^2)": 5,
-                                    "O(n^3)": 6,
-                                    "O(2^n)": 7,
-                                    "O(n!)": 8,
-                                }
-                                
                                 # For constants, always use O(1) complexity
                                 if entity.type == 'constant':
                                     complexity_value = "O(1)"
@@ -409,7 +406,7 @@ class IndexingService:
                                         complexity_value = analysis_result.complexity
                                     else:
                                         complexity_value = str(analysis_result.complexity)
-                                    complexity_numeric = complexity_map.get(complexity_value, 3)
+                                    complexity_numeric = COMPLEXITY_NUMERIC.get(complexity_value, 3)
                                 
                                 # Convert SecurityIssue objects to dicts
                                 security_issues_dict = []
@@ -532,6 +529,7 @@ class IndexingService:
                                     vector=embedding,
                                     payload={
                                         "entity_id": entity.id,
+                                        "project_id": file.project_id,
                                         "entity_type": entity.type,
                                         "name": entity.name,
                                         "description": analysis_result.description,
@@ -540,7 +538,7 @@ class IndexingService:
                                         "end_line": entity.end_line
                                     }
                                 )
-                                analysis.embedding_id = str(point_id)
+                                analysis.embedding_id = point_id
                                 db.commit()
                                 
                                 # Verify that analysis was created
@@ -613,6 +611,10 @@ class IndexingService:
                     except Exception as e:
                         logger.error(f"Error indexing file {file_path}: {e}")
                 
+                # Nothing else touches the project row here; the new updated_at tells
+                # other processes (the API) to drop their cached search results
+                project.updated_at = datetime.utcnow()
+                db.commit()
                 logger.info(f"Finished reindexing project: {project.name}")
             
         finally:
@@ -739,7 +741,8 @@ class IndexingService:
                         end_line=entity_data['end_line'],
                         visibility=entity_data.get('visibility'),
                         code=entity_data['code'],
-                        full_qualified_name=entity_data.get('full_qualified_name')
+                        full_qualified_name=entity_data.get('full_qualified_name'),
+                        is_enum_case=self._is_enum_case(entity_data)
                     )
                     db.add(entity)
                     db.flush()
@@ -753,6 +756,11 @@ class IndexingService:
         
         logger.info(f"Successfully indexed file: {file_path}")
     
+    @staticmethod
+    def _is_enum_case(entity_data: Dict) -> bool:
+        """Enum case values are constants with :: in full_qualified_name"""
+        return entity_data['type'] == 'constant' and '::' in (entity_data.get('full_qualified_name') or '')
+    
     def _process_entity(
         self,
         db: Session,
@@ -788,14 +796,11 @@ class IndexingService:
             entity.visibility = entity_data.get('visibility')
             entity.code = entity_data['code']
             entity.full_qualified_name = entity_data.get('full_qualified_name')
+            entity.is_enum_case = self._is_enum_case(entity_data)
             # Delete old analysis if exists (will be recreated below)
             if entity.analysis:
-                if entity.analysis.embedding_id:
-                    try:
-                        point_id = int(entity.analysis.embedding_id)
-                        self.qdrant.delete(point_id)
-                    except (ValueError, TypeError):
-                        pass
+                if entity.analysis.embedding_id is not None:
+                    self.qdrant.delete(entity.analysis.embedding_id)
                 db.delete(entity.analysis)
             # Delete old dependencies
             db.query(Dependency).filter(Dependency.entity_id == entity.id).delete()
@@ -809,7 +814,8 @@ class IndexingService:
                 end_line=entity_data['end_line'],
                 visibility=entity_data.get('visibility'),
                 code=entity_data['code'],
-                full_qualified_name=entity_data.get('full_qualified_name')
+                full_qualified_name=entity_data.get('full_qualified_name'),
+                is_enum_case=self._is_enum_case(entity_data)
             )
             db.add(entity)
         
@@ -914,7 +920,7 @@ class IndexingService:
                         logger.info(f"LLM error detected, attempting to reconnect...")
                         try:
                             # Reinitialize analyzer to get fresh connection
-                            self.analyzer = CodeAnalyzer()
+                            self.analyzer.reconnect()
                             logger.info(f"Reconnected to LLM provider: {self.analyzer.provider}")
                         except Exception as reconnect_error:
                             logger.error(f"Failed to reconnect to LLM: {reconnect_error}")
@@ -1003,18 +1009,6 @@ class IndexingService:
                 long_parameter_list=static_metrics['long_parameter_list'],
             )
         
-        # Define complexity map first
-        complexity_map = {
-            "O(1)": 1,
-            "O(log n)": 2,
-            "O(n)": 3,
-            "O(n log n)": 4,
-            "O(n^2)": 5,
-            "O(n^3)": 6,
-            "O(2^n)": 7,
-            "O(n!)": 8,
-        }
-        
         # For constants, always use O(1) complexity
         if entity_data['type'] == 'constant':
             complexity_value = "O(1)"
@@ -1029,7 +1023,7 @@ class IndexingService:
             else:
                 complexity_value = str(analysis_result.complexity)
             
-            complexity_numeric = complexity_map.get(complexity_value, 3)
+            complexity_numeric = COMPLEXITY_NUMERIC.get(complexity_value, 3)
         
         # Create analysis record with all metrics
         # Convert SecurityIssue objects to dicts for JSON storage
@@ -1158,6 +1152,7 @@ class IndexingService:
             vector=embedding,
             payload={
                 "entity_id": entity.id,
+                "project_id": file.project_id,
                 "entity_type": entity_data['type'],
                 "name": entity_data['name'],
                 "description": analysis_result.description,
@@ -1167,7 +1162,7 @@ class IndexingService:
             }
         )
         
-        analysis.embedding_id = str(point_id)  # Store as string in DB
+        analysis.embedding_id = point_id
         db.commit()
     
     def _generate_keywords(self, entity_data: Dict, description: str, code: str) -> str:
@@ -1574,15 +1569,11 @@ class IndexingService:
             return
         
         # Delete embeddings from Qdrant
-        entities = db.query(Entity).filter(Entity.file_id == file_id).all()
-        for entity in entities:
-            if entity.analysis and entity.analysis.embedding_id:
-                # Convert string ID back to int for Qdrant
-                try:
-                    point_id = int(entity.analysis.embedding_id)
-                    self.qdrant.delete(point_id)
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid embedding_id format: {entity.analysis.embedding_id}")
+        entities = db.query(Entity).options(selectinload(Entity.analysis)).filter(Entity.file_id == file_id).all()
+        self.qdrant.delete_many([
+            entity.analysis.embedding_id for entity in entities
+            if entity.analysis and entity.analysis.embedding_id is not None
+        ])
         
         # Delete from DB (cascade will handle related records)
         db.delete(file)
@@ -1624,17 +1615,14 @@ class IndexingService:
                 files = db.query(File).filter(File.project_id == project_id).all()
                 
                 # Delete embeddings from Qdrant and entities from DB
-                deleted_count = 0
-                for file in files:
-                    entities = db.query(Entity).filter(Entity.file_id == file.id).all()
-                    for entity in entities:
-                        if entity.analysis and entity.analysis.embedding_id:
-                            try:
-                                point_id = int(entity.analysis.embedding_id)
-                                self.qdrant.delete(point_id)
-                            except (ValueError, TypeError):
-                                logger.warning(f"Invalid embedding_id format: {entity.analysis.embedding_id}")
-                        deleted_count += 1
+                entities = db.query(Entity).options(selectinload(Entity.analysis)).join(File).filter(
+                    File.project_id == project_id
+                ).all()
+                deleted_count = len(entities)
+                self.qdrant.delete_many([
+                    entity.analysis.embedding_id for entity in entities
+                    if entity.analysis and entity.analysis.embedding_id is not None
+                ])
                 
                 # Delete all files (cascade will delete entities and analyses)
                 for file in files:
@@ -1674,15 +1662,12 @@ class IndexingService:
                         logger.warning(f"Failed to revoke indexing task {project.indexing_task_id}: {e}")
                 
                 # Delete embeddings from Qdrant
-                entities = db.query(Entity).filter(Entity.file_id == file_id).all()
+                entities = db.query(Entity).options(selectinload(Entity.analysis)).filter(Entity.file_id == file_id).all()
                 deleted_count = len(entities)
-                for entity in entities:
-                    if entity.analysis and entity.analysis.embedding_id:
-                        try:
-                            point_id = int(entity.analysis.embedding_id)
-                            self.qdrant.delete(point_id)
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid embedding_id format: {entity.analysis.embedding_id}")
+                self.qdrant.delete_many([
+                    entity.analysis.embedding_id for entity in entities
+                    if entity.analysis and entity.analysis.embedding_id is not None
+                ])
                 
                 # Delete file (cascade will delete entities and analyses)
                 db.delete(file)
@@ -1704,14 +1689,20 @@ class IndexingService:
                 logger.info(f"Deleted {deleted_count} entities from file {file_id}. Updated counters: {actual_entities} entities, {actual_files} files. Reset tokens_used to 0")
                 
             elif entity_ids:
-                # Delete specific entities
-                entities = db.query(Entity).filter(Entity.id.in_(entity_ids)).all()
-                if not entities:
+                # Delete specific entities in bounded batches so large id lists
+                # never exceed driver parameter limits
+                entity_ids = list(entity_ids)
+                file_ids = set()
+                for chunk in _batched(entity_ids, DELETE_BATCH_SIZE):
+                    file_ids.update(
+                        file_id for (file_id,) in
+                        db.query(Entity.file_id).filter(Entity.id.in_(chunk)).distinct()
+                    )
+                if not file_ids:
                     logger.warning(f"No entities found with IDs: {entity_ids}")
                     return
                 
                 # Get project for counter update
-                file_ids = set(e.file_id for e in entities)
                 files = db.query(File).filter(File.id.in_(file_ids)).all()
                 project_ids = set(f.project_id for f in files)
                 
@@ -1733,20 +1724,19 @@ class IndexingService:
                         except Exception as e:
                             logger.warning(f"Failed to revoke indexing task {project.indexing_task_id}: {e}")
                 
-                # Delete embeddings from Qdrant
+                # Delete embeddings from Qdrant and entities from DB, one batch at a time
                 deleted_count = 0
-                for entity in entities:
-                    if entity.analysis and entity.analysis.embedding_id:
-                        try:
-                            point_id = int(entity.analysis.embedding_id)
-                            self.qdrant.delete(point_id)
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid embedding_id format: {entity.analysis.embedding_id}")
-                    deleted_count += 1
-                
-                # Delete entities (cascade will delete analyses)
-                for entity in entities:
-                    db.delete(entity)
+                for chunk in _batched(entity_ids, DELETE_BATCH_SIZE):
+                    point_ids = db.query(Analysis.embedding_id).filter(
+                        Analysis.entity_id.in_(chunk),
+                        Analysis.embedding_id.isnot(None)
+                    ).all()
+                    self.qdrant.delete_many([point_id for (point_id,) in point_ids])
+                    
+                    # Bulk delete (FK ON DELETE CASCADE removes analyses and dependencies)
+                    deleted_count += db.query(Entity).filter(Entity.id.in_(chunk)).delete(
+                        synchronize_session=False
+                    )
                 
                 # Update project counters - recalculate from actual DB state
                 for project_id in project_ids:
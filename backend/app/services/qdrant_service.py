@@ -1,11 +1,19 @@
 import logging
-from typing import List, Optional
+import threading
+from typing import List, Optional, Union
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, PayloadSchemaType
+)
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Collection readiness is process-wide: only the first service instance
+# in a worker needs to ask Qdrant whether the collection exists.
+_collection_ready = False
+_collection_lock = threading.Lock()
+
 
 class QdrantService:
     """Service for managing Qdrant vector database"""
@@ -18,7 +26,18 @@ class QdrantService:
         self._ensure_collection()
     
     def _ensure_collection(self):
-        """Create collection if it doesn't exist"""
+        """Create collection if it doesn't exist (once per process)"""
+        global _collection_ready
+        if _collection_ready:
+            return
+        with _collection_lock:
+            if _collection_ready:
+                return
+            self._create_collection_if_missing()
+            _collection_ready = True
+    
+    def _create_collection_if_missing(self):
+        """Check Qdrant for the collection and create it when missing"""
         try:
             collections = self.client.get_collections()
             collection_names = [c.name for c in collections.collections]
@@ -32,10 +51,19 @@ class QdrantService:
                     )
                 )
                 logger.info(f"Created Qdrant collection: {self.collection_name}")
+                self.ensure_project_index()
         except Exception as e:
             logger.error(f"Error ensuring collection: {e}")
             raise
     
+    def ensure_project_index(self):
+        """Index the project_id payload field used to scope searches"""
+        self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="project_id",
+            field_schema=PayloadSchemaType.INTEGER
+        )
+    
     def upsert_embedding(
         self,
         point_id: int,  # Qdrant accepts int or UUID
@@ -62,9 +90,25 @@ class QdrantService:
         self,
         query_vector: List[float],
         limit: int = 10,
-        filter: Optional[dict] = None
+        filter: Optional[Union[Filter, dict]] = None,
+        project_id: Optional[int] = None
     ) -> List[dict]:
-        """Search similar vectors"""
+        """Search similar vectors
+        
+        Args:
+            filter: Optional Qdrant filter (Filter or its dict form)
+            project_id: If set, only points with this project_id in payload are searched
+                (combined with filter, not replacing it)
+        """
+        if project_id is not None:
+            project_condition = FieldCondition(key="project_id", match=MatchValue(value=project_id))
+            if filter is None:
+                filter = Filter(must=[project_condition])
+            else:
+                # Nested as a must condition, so the caller's should/must_not keep their meaning
+                if isinstance(filter, dict):
+                    filter = Filter(**filter)
+                filter = Filter(must=[filter, project_condition])
         try:
             results = self.client.search(
                 collection_name=self.collection_name,
@@ -94,4 +138,25 @@ class QdrantService:
             )
         except Exception as e:
             logger.error(f"Error deleting embedding: {e}")
-
+    
+    def set_payload(self, point_ids: List[int], payload: dict):
+        """Set payload fields on existing points"""
+        if not point_ids:
+            return
+        self.client.set_payload(
+            collection_name=self.collection_name,
+            payload=payload,
+            points=list(point_ids)
+        )
+    
+    def delete_many(self, point_ids: List[int]):
+        """Delete multiple embeddings in a single request"""
+        if not point_ids:
+            return
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=list(point_ids)
+            )
+        except Exception as e:
+            logger.error(f"Error deleting embeddings: {e}")
@@ -1,22 +1,193 @@
+import copy
 import logging
 import json
 import re
-from typing import List, Dict, Optional, Set
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, cast, String
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Set, Tuple
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, or_, any_, func, cast, case, String
+from sqlalchemy.dialects.postgresql import array, JSONB
 
 from app.models.database import Project, Entity, Analysis, File, Dependency
 from app.api.models.schemas import SearchResult, EntityResponse, AnalysisResponse
 from app.services.embedding_service import EmbeddingService
 from app.services.qdrant_service import QdrantService
+from app.services.semantic_query_cache import SemanticQueryCache
 from app.agents.analyzer import CodeAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Complexity notation after "сложностью" (also covers "со сложностью ..."),
+# compiled once at import time
+COMPLEXITY_PATTERNS = [
+    (re.compile(r'сложностью\s+o\(n!\)'), 8),
+    (re.compile(r'сложностью\s+o\(2\^n\)'), 7),
+    (re.compile(r'сложностью\s+o\(n\^3\)'), 6),
+    (re.compile(r'сложностью\s+o\(n\^2\)'), 5),
+    (re.compile(r'сложностью\s+o\(n\s+log\s+n\)'), 4),
+    (re.compile(r'сложностью\s+o\(n\)'), 3),
+    (re.compile(r'сложностью\s+o\(log\s+n\)'), 2),
+    (re.compile(r'сложностью\s+o\(1\)'), 1),
+    (re.compile(r'сложностью\s+np'), 8),  # NP-complete is usually factorial/exponential
+]
+
+# Query tokenization for keyword search (Russian and English words)
+QUERY_TOKEN_RE = re.compile(r'\b[а-яё]+|\b[a-z]+')
+
+# Common Russian endings stripped to get root forms:
+# -ами, -ии, -ию, -ий, -ие, -ей, -ем, -ах, -ия (отправки -> отправк, сообщений -> сообщени),
+# and singular genitive -и for words longer than 5 letters
+RUSSIAN_SUFFIX_RE = re.compile(r'(?:ами|ии|ию|ий|ие|ей|ем|ах|ия)$|(?<=[а-яё]{5})и$')
+
+STOP_WORDS = frozenset({
+    # Russian
+    'найти', 'все', 'для', 'которые', 'который', 'которую', 'которое',
+    # English
+    'find', 'all', 'the', 'for', 'which', 'that',
+})
+
+# Entity type words are used for filtering, not as search keywords
+ENTITY_TYPE_WORDS = frozenset({
+    'методы', 'метод', 'классы', 'класс', 'функции', 'функция',
+    'methods', 'method', 'classes', 'class', 'functions', 'function',
+})
+
+
+def _keyword_matcher(*keywords: str) -> re.Pattern:
+    """Compile keyword alternatives so a whole group is checked in a single scan"""
+    return re.compile('|'.join(re.escape(kw) for kw in keywords))
+
+
+def _first_match(rules: List, text: str):
+    """Return the value of the first (matcher, value) rule found in text"""
+    for matcher, value in rules:
+        if matcher.search(text):
+            return value
+    return None
+
+
+# Heuristic keyword groups for QueryAnalyzer (English and Russian), first match wins
+ENTITY_TYPE_KEYWORDS = [
+    (_keyword_matcher('метод', 'method'), 'method'),
+    (_keyword_matcher('класс', 'class'), 'class'),
+    (_keyword_matcher('функция', 'function'), 'function'),
+    (_keyword_matcher('enum', 'перечислен'), 'enum'),
+    (_keyword_matcher('констант', 'constant'), 'constant'),
+]
+
+MVC_ROLE_KEYWORDS = [
+    (_keyword_matcher('контроллер', 'controller'), 'Controller'),
+    (_keyword_matcher('модель', 'model', 'модели'), 'Model'),
+    (_keyword_matcher('представление', 'представления', 'view'), 'View'),
+    (_keyword_matcher('сервис', 'service'), 'Service'),
+    (_keyword_matcher('репозиторий', 'репозитории', 'repository', 'repositories'), 'Repository'),
+]
+
+DDD_ROLE_KEYWORDS = [
+    (_keyword_matcher('сущность', 'entity', 'entities', 'сущности'), 'Entity'),
+    (_keyword_matcher('объект-значение', 'value object', 'объекты-значения'), 'ValueObject'),
+    (_keyword_matcher('агрегат', 'aggregate'), 'Aggregate'),
+    (_keyword_matcher('сервис', 'service'), 'Service'),
+    (_keyword_matcher('репозиторий', 'репозитории', 'repository', 'repositories'), 'Repository'),
+    (_keyword_matcher('фабрика', 'фабрики', 'factory', 'factories'), 'Factory'),
+]
+
+COMPLEXITY_KEYWORDS = [
+    (_keyword_matcher('o(n!)', 'factorial', 'факториальн'), 8),
+    (_keyword_matcher('o(2^', 'exponential', 'экспоненциальн'), 7),
+    (_keyword_matcher('o(n^3)', 'o(n3)', 'cubic', 'кубическ'), 6),
+    (_keyword_matcher('o(n^2)', 'o(n2)', 'quadratic', 'квадратичн'), 5),
+    (_keyword_matcher('o(n log n)', 'o(n*log', 'linearithmic', 'линеарифмическ'), 4),
+]
+OR_HIGHER_KEYWORDS = _keyword_matcher('или выше', 'or higher', 'or above', 'и выше')
+MORE_THAN_KEYWORDS = _keyword_matcher('больше', 'more than', 'выше')
+LOGARITHMIC_KEYWORDS = _keyword_matcher('o(log n)', 'логарифмическ')
+CONSTANT_KEYWORDS = _keyword_matcher('o(1)', 'константн', 'constant')
+
+SOLID_PRINCIPLE_KEYWORDS = [
+    (_keyword_matcher('liskov', 'lsp', 'лисков'), 'Liskov Substitution Principle'),
+    (_keyword_matcher('single responsibility', 'srp', 'единичн'), 'Single Responsibility Principle'),
+    (_keyword_matcher('open/closed', 'ocp', 'открыт/закрыт'), 'Open/Closed Principle'),
+    (_keyword_matcher('interface segregation', 'isp', 'сегрегации интерфейса'), 'Interface Segregation Principle'),
+    (_keyword_matcher('dependency inversion', 'dip', 'инверсии зависимостей'), 'Dependency Inversion Principle'),
+]
+RESPONSIBILITY_KEYWORDS = _keyword_matcher('ответственн', 'responsibility')
+
+TESTABILITY_KEYWORDS = _keyword_matcher('testable', 'unit test')
+
+DESIGN_PATTERN_KEYWORDS = [
+    (_keyword_matcher('factory'), 'Factory'),
+    (_keyword_matcher('strategy'), 'Strategy'),
+    (_keyword_matcher('observer'), 'Observer'),
+]
+
+
+@lru_cache(maxsize=2048)
+def _normalize_query_keywords(query: str) -> Tuple[str, ...]:
+    """Normalize query and extract keywords (cached, queries repeat often)"""
+    normalized_words = []
+    for word in QUERY_TOKEN_RE.findall(query.lower()):
+        # Skip entity type words (методы, классы) - they're used for filtering, not search
+        if word in ENTITY_TYPE_WORDS:
+            continue
+        
+        # Normalize Russian word endings to root forms
+        if len(word) > 4:
+            word = RUSSIAN_SUFFIX_RE.sub('', word, count=1)
+        
+        normalized_words.append(word)
+    
+    # Filter out stop words and short words
+    return tuple(w for w in normalized_words if w not in STOP_WORDS and len(w) > 3)
+
+# Keyword groups that enable extra SearchService.search branches
+ENUM_QUERY_KEYWORDS = _keyword_matcher('статус', 'status', 'enum', 'перечислен')
+SOLID_QUERY_KEYWORDS = _keyword_matcher('solid', 'нарушен', 'violation', 'responsibility', 'ответственн')
+DEPENDENCY_QUERY_KEYWORDS = _keyword_matcher(
+    'sqlalchemy', 'db.query', 'db.add', 'db.commit', 'db.flush', 'db.delete',
+    'зависимост', 'dependency', 'использует', 'uses', 'вызывает', 'calls'
+)
+
+# Dependency names searched for SQLAlchemy-related queries in Python projects
+SQLALCHEMY_DEPENDENCY_PATTERNS = frozenset({
+    'db.query', 'db.add', 'db.commit', 'db.flush', 'db.delete',
+    'db.rollback', 'db.refresh', 'db.close', 'session'
+})
+
+# Query terms that boost results whose description mentions any term of the group
+RANK_KEY_TERM_GROUPS = (
+    ('отправк', 'send', 'сообщени', 'message'),
+    ('метод', 'method'),
+    ('статус', 'status'),
+)
+
+
+@dataclass
+class _RawHit:
+    """Search hit backed by ORM rows; converted to SearchResult only if returned"""
+    entity: Entity
+    analysis: Analysis
+    file: File
+    score: float
+    match_type: str
+
 
 class QueryAnalyzer:
     """Analyze search query to determine search strategy"""
     
+    # Class-level cache: (base_url, model, query) -> LLM filters
+    # (analyzers are created per request, so the cache must outlive instances)
+    _llm_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+    _llm_cache_lock = threading.Lock()
+    LLM_CACHE_SIZE = 4096
+    
+    # Shared pool for LLM calls started ahead of time (see start_llm_analysis)
+    _llm_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query-llm")
+    
     def __init__(self):
         try:
             self.analyzer = CodeAnalyzer()
@@ -24,13 +195,49 @@ class QueryAnalyzer:
             logger.warning(f"Failed to initialize CodeAnalyzer for query analysis: {e}")
             self.analyzer = None
     
-    def analyze_query(self, query: str, use_llm: bool = True) -> Dict:
+    def start_llm_analysis(self, query: str) -> Optional[Future]:
+        """Start LLM query analysis in the background
+        
+        Returns a future to pass to analyze_query, or None if no LLM is configured.
+        """
+        if not (self.analyzer and self.analyzer.client):
+            return None
+        return self._llm_executor.submit(self._analyze_query_with_llm, query)
+    
+    def analyze_query(self, query: str, use_llm: bool = True, llm_future: Optional[Future] = None) -> Dict:
         """Analyze query and extract structured filters
         
         Args:
             query: Search query
             use_llm: If True, use LLM to enhance query understanding (for MVC/DDD roles)
+            llm_future: LLM analysis already started with start_llm_analysis
         """
+        # Heuristics are pure and cached; copy so callers never mutate the cached dict
+        filters = copy.deepcopy(self._analyze_query_heuristics(query))
+        
+        # Use LLM to enhance query understanding for complex queries
+        if use_llm and self.analyzer and self.analyzer.client:
+            try:
+                if llm_future is not None:
+                    llm_filters = llm_future.result()
+                else:
+                    llm_filters = self._analyze_query_with_llm(query)
+                # Merge LLM results, prioritizing LLM if it found something
+                if llm_filters.get('mvc_role_filter'):
+                    filters['mvc_role_filter'] = llm_filters['mvc_role_filter']
+                if llm_filters.get('ddd_role_filter'):
+                    filters['ddd_role_filter'] = llm_filters['ddd_role_filter']
+                if llm_filters.get('entity_type_filter') and not filters.get('entity_type_filter'):
+                    filters['entity_type_filter'] = llm_filters['entity_type_filter']
+            except Exception as e:
+                logger.warning(f"LLM query analysis failed: {e}, using heuristic only")
+        
+        return filters
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _analyze_query_heuristics(query: str) -> Dict:
+        """Extract structured filters from query using keyword heuristics"""
         filters = {
             'complexity_filter': None,
             'solid_filter': None,
@@ -45,145 +252,91 @@ class QueryAnalyzer:
         query_lower = query.lower()
         
         # Entity type filters (English and Russian)
-        if 'метод' in query_lower or 'method' in query_lower:
-            filters['entity_type_filter'] = 'method'
-        elif 'класс' in query_lower or 'class' in query_lower:
-            filters['entity_type_filter'] = 'class'
-        elif 'функция' in query_lower or 'function' in query_lower:
-            filters['entity_type_filter'] = 'function'
-        elif 'enum' in query_lower or 'перечислен' in query_lower:
-            filters['entity_type_filter'] = 'enum'
-        elif 'констант' in query_lower or 'constant' in query_lower:
-            filters['entity_type_filter'] = 'constant'
+        filters['entity_type_filter'] = _first_match(ENTITY_TYPE_KEYWORDS, query_lower)
         
         # MVC role filters (heuristic-based)
-        mvc_keywords = {
-            'controller': ['контроллер', 'controller', 'контроллеры', 'controllers'],
-            'model': ['модель', 'model', 'модели', 'models'],
-            'view': ['представление', 'view', 'представления', 'views'],
-            'service': ['сервис', 'service', 'сервисы', 'services'],
-            'repository': ['репозиторий', 'repository', 'репозитории', 'repositories'],
-        }
-        for role, keywords in mvc_keywords.items():
-            if any(kw in query_lower for kw in keywords):
-                filters['mvc_role_filter'] = role.capitalize()
-                break
+        filters['mvc_role_filter'] = _first_match(MVC_ROLE_KEYWORDS, query_lower)
         
         # DDD role filters (heuristic-based)
-        ddd_keywords = {
-            'Entity': ['сущность', 'entity', 'entities', 'сущности'],
-            'ValueObject': ['объект-значение', 'value object', 'value objects', 'объекты-значения'],
-            'Aggregate': ['агрегат', 'aggregate', 'агрегаты', 'aggregates'],
-            'Service': ['сервис', 'service', 'сервисы', 'services'],
-            'Repository': ['репозиторий', 'repository', 'репозитории', 'repositories'],
-            'Factory': ['фабрика', 'factory', 'фабрики', 'factories'],
-        }
-        for role, keywords in ddd_keywords.items():
-            if any(kw in query_lower for kw in keywords):
-                filters['ddd_role_filter'] = role
-                break
-        
-        # Use LLM to enhance query understanding for complex queries
-        if use_llm and self.analyzer and self.analyzer.client:
-            try:
-                llm_filters = self._analyze_query_with_llm(query)
-                # Merge LLM results, prioritizing LLM if it found something
-                if llm_filters.get('mvc_role_filter'):
-                    filters['mvc_role_filter'] = llm_filters['mvc_role_filter']
-                if llm_filters.get('ddd_role_filter'):
-                    filters['ddd_role_filter'] = llm_filters['ddd_role_filter']
-                if llm_filters.get('entity_type_filter') and not filters.get('entity_type_filter'):
-                    filters['entity_type_filter'] = llm_filters['entity_type_filter']
-            except Exception as e:
-                logger.warning(f"LLM query analysis failed: {e}, using heuristic only")
+        filters['ddd_role_filter'] = _first_match(DDD_ROLE_KEYWORDS, query_lower)
         
         # Complexity filters (English and Russian)
         # Check for specific complexity patterns first (most specific)
-        if 'o(n!)' in query_lower or 'o(n!)' in query_lower or 'factorial' in query_lower or 'факториальн' in query_lower or ('np' in query_lower and 'сложност' in query_lower):
+        if 'np' in query_lower and 'сложност' in query_lower:
             # NP-complete problems are often factorial or exponential
-            filters['complexity_filter'] = {'min': 8, 'max': 8}  # O(n!)
-        elif 'o(2^n)' in query_lower or 'o(2^' in query_lower or 'exponential' in query_lower or 'экспоненциальн' in query_lower:
-            filters['complexity_filter'] = {'min': 7, 'max': 7}  # O(2^n)
-        elif 'o(n^3)' in query_lower or 'o(n3)' in query_lower or 'cubic' in query_lower or 'кубическ' in query_lower:
-            filters['complexity_filter'] = {'min': 6, 'max': 6}
-        elif 'o(n^2)' in query_lower or 'o(n2)' in query_lower or 'quadratic' in query_lower or 'квадратичн' in query_lower:
-            filters['complexity_filter'] = {'min': 5, 'max': 5}
-        elif 'o(n log n)' in query_lower or 'o(n*log' in query_lower or 'linearithmic' in query_lower or 'линеарифмическ' in query_lower:
-            filters['complexity_filter'] = {'min': 4, 'max': 4}  # O(n log n)
-        elif ('o(n)' in query_lower or 'сложностью o(n)' in query_lower) and 'log' not in query_lower:
+            exact_complexity = 8  # O(n!)
+        else:
+            exact_complexity = _first_match(COMPLEXITY_KEYWORDS, query_lower)
+        
+        if exact_complexity:
+            filters['complexity_filter'] = {'min': exact_complexity, 'max': exact_complexity}
+        elif 'o(n)' in query_lower and 'log' not in query_lower:
             # O(n) or higher
-            if 'или выше' in query_lower or 'or higher' in query_lower or 'or above' in query_lower or 'и выше' in query_lower:
+            if OR_HIGHER_KEYWORDS.search(query_lower):
                 # "или выше" означает >= O(n)
                 filters['complexity_filter'] = {'min': 3}  # O(n) and above
-            elif 'больше чем' in query_lower or 'больше' in query_lower or 'more than' in query_lower or 'выше' in query_lower:
+            elif MORE_THAN_KEYWORDS.search(query_lower):
                 # "больше чем" означает строго > O(n), т.е. >= O(n log n)
                 filters['complexity_filter'] = {'min': 4}  # Strictly greater than O(n), i.e. O(n log n) and above
             else:
                 filters['complexity_filter'] = {'min': 3, 'max': 3}  # Exactly O(n)
-        elif 'o(log n)' in query_lower or 'логарифмическ' in query_lower:
+        elif LOGARITHMIC_KEYWORDS.search(query_lower):
             filters['complexity_filter'] = {'min': 2, 'max': 2}
-        elif 'o(1)' in query_lower or 'константн' in query_lower or 'constant' in query_lower:
+        elif CONSTANT_KEYWORDS.search(query_lower):
             filters['complexity_filter'] = {'min': 1, 'max': 1}
         # Check for "сложностью" or "сложность" followed by complexity notation
         elif 'сложност' in query_lower:
             # Try to extract complexity from patterns like "сложностью O(n^2)", "со сложностью NP", etc.
-            # Match patterns like "сложностью O(...)", "со сложностью O(...)", "сложность O(...)"
-            complexity_patterns = [
-                (r'сложностью\s+o\(n!\)', 8),
-                (r'со\s+сложностью\s+o\(n!\)', 8),
-                (r'сложностью\s+o\(2\^n\)', 7),
-                (r'со\s+сложностью\s+o\(2\^n\)', 7),
-                (r'сложностью\s+o\(n\^3\)', 6),
-                (r'со\s+сложностью\s+o\(n\^3\)', 6),
-                (r'сложностью\s+o\(n\^2\)', 5),
-                (r'со\s+сложностью\s+o\(n\^2\)', 5),
-                (r'сложностью\s+o\(n\s+log\s+n\)', 4),
-                (r'со\s+сложностью\s+o\(n\s+log\s+n\)', 4),
-                (r'сложностью\s+o\(n\)', 3),
-                (r'со\s+сложностью\s+o\(n\)', 3),
-                (r'сложностью\s+o\(log\s+n\)', 2),
-                (r'со\s+сложностью\s+o\(log\s+n\)', 2),
-                (r'сложностью\s+o\(1\)', 1),
-                (r'со\s+сложностью\s+o\(1\)', 1),
-                (r'сложностью\s+np', 8),  # NP-complete is usually factorial/exponential
-                (r'со\s+сложностью\s+np', 8),
-            ]
-            for pattern, complexity_num in complexity_patterns:
-                if re.search(pattern, query_lower):
+            for pattern, complexity_num in COMPLEXITY_PATTERNS:
+                if pattern.search(query_lower):
                     filters['complexity_filter'] = {'min': complexity_num, 'max': complexity_num}
                     break
         
         # SOLID filters (English and Russian)
-        if 'liskov' in query_lower or 'lsp' in query_lower or 'лисков' in query_lower:
-            filters['solid_filter'] = {'principle': 'Liskov Substitution Principle'}
-        elif 'single responsibility' in query_lower or 'srp' in query_lower or 'единичной ответственности' in query_lower or 'единичн' in query_lower or 'принцип единичн' in query_lower or 'нарушен' in query_lower and ('ответственн' in query_lower or 'responsibility' in query_lower):
-            filters['solid_filter'] = {'principle': 'Single Responsibility Principle'}
-        elif 'open/closed' in query_lower or 'ocp' in query_lower or 'открыт/закрыт' in query_lower:
-            filters['solid_filter'] = {'principle': 'Open/Closed Principle'}
-        elif 'interface segregation' in query_lower or 'isp' in query_lower or 'сегрегации интерфейса' in query_lower:
-            filters['solid_filter'] = {'principle': 'Interface Segregation Principle'}
-        elif 'dependency inversion' in query_lower or 'dip' in query_lower or 'инверсии зависимостей' in query_lower:
-            filters['solid_filter'] = {'principle': 'Dependency Inversion Principle'}
-        elif 'solid' in query_lower and ('нарушен' in query_lower or 'violation' in query_lower):
-            # Generic SOLID violation search - will match any SOLID violation
-            filters['solid_filter'] = {'principle': None}  # None means any SOLID violation
+        is_violation_query = 'нарушен' in query_lower
+        responsibility_violation = is_violation_query and RESPONSIBILITY_KEYWORDS.search(query_lower)
+        for matcher, principle in SOLID_PRINCIPLE_KEYWORDS:
+            if matcher.search(query_lower) or (
+                responsibility_violation and principle == 'Single Responsibility Principle'
+            ):
+                filters['solid_filter'] = {'principle': principle}
+                break
+        else:
+            if 'solid' in query_lower and (is_violation_query or 'violation' in query_lower):
+                # Generic SOLID violation search - will match any SOLID violation
+                filters['solid_filter'] = {'principle': None}  # None means any SOLID violation
         
         # Testability
-        if 'testable' in query_lower or 'unit test' in query_lower:
+        if TESTABILITY_KEYWORDS.search(query_lower):
             filters['testability_filter'] = {'min_score': 0.5}
         
         # Pattern filters
-        if 'factory' in query_lower:
-            filters['pattern_filter'] = 'Factory'
-        elif 'strategy' in query_lower:
-            filters['pattern_filter'] = 'Strategy'
-        elif 'observer' in query_lower:
-            filters['pattern_filter'] = 'Observer'
+        filters['pattern_filter'] = _first_match(DESIGN_PATTERN_KEYWORDS, query_lower)
         
         return filters
     
     def _analyze_query_with_llm(self, query: str) -> Dict:
-        """Use LLM to analyze query and extract MVC/DDD role filters"""
+        """Use LLM to analyze query and extract MVC/DDD role filters
+        
+        Successful responses are cached per model, so repeated queries skip the LLM call.
+        """
+        cache_key = (str(getattr(self.analyzer.client, 'base_url', '')), self.analyzer.model, query)
+        with self._llm_cache_lock:
+            cached = self._llm_cache.get(cache_key)
+            if cached is not None:
+                self._llm_cache.move_to_end(cache_key)
+                return dict(cached)
+        
+        llm_result = self._request_llm_query_filters(query)
+        if llm_result:
+            with self._llm_cache_lock:
+                self._llm_cache[cache_key] = dict(llm_result)
+                if len(self._llm_cache) > self.LLM_CACHE_SIZE:
+                    self._llm_cache.popitem(last=False)
+        return llm_result
+    
+    def _request_llm_query_filters(self, query: str) -> Dict:
+        """Ask the LLM for MVC/DDD role filters (empty dict on failure)"""
         try:
             prompt = f"""Analyze the following code search query and extract structured information.
 
@@ -239,6 +392,13 @@ Respond with JSON only, no additional text."""
 class SearchService:
     """Service for searching code"""
     
+    # Shared pool for vector searches prefetched while the SQL branches run
+    _vector_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search-vector")
+    
+    # Class-level cache: project_id -> language (set at project creation, never changes)
+    _project_languages: Dict[int, str] = {}
+    _project_languages_lock = threading.Lock()
+    
     def __init__(self):
         self.query_analyzer = QueryAnalyzer()
         self.embedding_service = EmbeddingService()
@@ -264,53 +424,51 @@ class SearchService:
             logger.warning("Search called without project_id - returning empty results")
             return []
         
+        # The LLM call runs while the query embedding is generated and the cache is
+        # checked; its filters (entity type) are needed before the keyword search starts.
+        # On a cache hit the call is cancelled if still queued, otherwise its result
+        # only fills the LLM filter cache.
+        llm_future = self.query_analyzer.start_llm_analysis(query)
+        
+        # Near-identical queries reuse recent results for the project
+        query_embedding = self.embedding_service.generate_query_embedding(query)
+        cache_key = self._semantic_cache_key(db, query, project_id)
+        cached_results = SemanticQueryCache.get(project_id, cache_key, query_embedding, limit)
+        if cached_results is not None:
+            if llm_future is not None:
+                llm_future.cancel()
+            return cached_results
+        
+        # The vector search needs only the embedding, so Qdrant is queried while the
+        # SQL branches below run (enough candidates for the largest semantic limit)
+        vector_future = self._vector_executor.submit(
+            self.qdrant.search, query_embedding, limit * 2, project_id=project_id
+        )
+        
         # Analyze query
-        filters = self.query_analyzer.analyze_query(query)
+        filters = self.query_analyzer.analyze_query(query, llm_future=llm_future)
         
-        results = []
-        seen_entity_ids = set()
+        # Lowercased once and shared by all branches below
+        query_lower = query.lower()
+        
+        # Results are deduplicated as they are added (see _merge_result)
+        unique_results = {}
         
         # 1. Keyword search (exact matches first) - highest priority
         keyword_results = self._keyword_search(db, query, filters, project_id, limit)
         for result in keyword_results:
-            if result.entity.id not in seen_entity_ids:
-                results.append(result)
-                seen_entity_ids.add(result.entity.id)
+            self._merge_result(unique_results, result)
         
         # 1.5. If query is about statuses/enums and we found enum class, also search for enum cases
-        query_lower = query.lower()
-        if any(kw in query_lower for kw in ['статус', 'status', 'enum', 'перечислен']):
+        if ENUM_QUERY_KEYWORDS.search(query_lower):
             # Find enum classes in results
             enum_classes = [r for r in keyword_results if r.entity.type == 'class' and ('status' in r.entity.name.lower() or 'enum' in r.entity.name.lower())]
-            if enum_classes:
-                # Search for enum cases (constants with :: in FQN)
-                for enum_class in enum_classes:
-                    enum_name = enum_class.entity.name
-                    # Find constants that belong to this enum (must have :: in FQN)
-                    enum_cases = db.query(Entity, Analysis, File).join(
-                        Analysis, Entity.id == Analysis.entity_id
-                    ).join(File, Entity.file_id == File.id).filter(
-                        File.project_id == project_id,
-                        Entity.type == 'constant',
-                        Entity.full_qualified_name.like(f'%{enum_name}::%')
-                    ).limit(10).all()
-                    
-                    for entity, analysis, file in enum_cases:
-                        if entity.id not in seen_entity_ids:
-                            results.append(SearchResult(
-                                entity=self._entity_to_response(entity, file),
-                                analysis=self._analysis_to_response(analysis, entity, file),
-                                score=0.9,  # Very high score for enum cases when enum class is found
-                                match_type="keyword"
-                            ))
-                            seen_entity_ids.add(entity.id)
+            enum_names = [r.entity.name for r in enum_classes]
             
             # Also search for enum classes directly if not found yet
             if not enum_classes:
                 # Search for enum classes by name pattern
-                enum_class_search = db.query(Entity, Analysis, File).join(
-                    Analysis, Entity.id == Analysis.entity_id
-                ).join(File, Entity.file_id == File.id).filter(
+                enum_class_search = self._result_query(db).filter(
                     File.project_id == project_id,
                     Entity.type == 'class',
                     or_(
@@ -320,51 +478,24 @@ class SearchService:
                 ).limit(5).all()
                 
                 for entity, analysis, file in enum_class_search:
-                    if entity.id not in seen_entity_ids:
-                        results.append(SearchResult(
-                            entity=self._entity_to_response(entity, file),
-                            analysis=self._analysis_to_response(analysis, entity, file),
-                            score=0.7,
-                            match_type="keyword"
-                        ))
-                        seen_entity_ids.add(entity.id)
-                        
-                        # Also get enum cases for this class
-                        enum_name = entity.name
-                        enum_cases = db.query(Entity, Analysis, File).join(
-                            Analysis, Entity.id == Analysis.entity_id
-                        ).join(File, Entity.file_id == File.id).filter(
-                            File.project_id == project_id,
-                            Entity.type == 'constant',
-                            Entity.full_qualified_name.like(f'%{enum_name}::%')
-                        ).limit(10).all()
-                        
-                        for case_entity, case_analysis, case_file in enum_cases:
-                            if case_entity.id not in seen_entity_ids:
-                                results.append(SearchResult(
-                                    entity=self._entity_to_response(case_entity, case_file),
-                                    analysis=self._analysis_to_response(case_analysis, case_entity, case_file),
-                                    score=0.9,
-                                    match_type="keyword"
-                                ))
-                                seen_entity_ids.add(case_entity.id)
+                    self._merge_result(unique_results, self._build_hit(entity, analysis, file, 0.7, "keyword"))
+                    enum_names.append(entity.name)
+            
+            # Enum cases (constants with EnumName:: in FQN) for all classes in one query
+            for entity, analysis, file in self._find_enum_cases(db, project_id, enum_names):
+                # Very high score for enum cases when enum class is found
+                self._merge_result(unique_results, self._build_hit(entity, analysis, file, 0.9, "keyword"))
         
         # 2. Structured search (SQL) - for specific filters
         structured_results = self._structured_search(db, filters, project_id, limit)
         for result in structured_results:
-            if result.entity.id not in seen_entity_ids:
-                results.append(result)
-                seen_entity_ids.add(result.entity.id)
+            self._merge_result(unique_results, result)
         
         # 2.5. If SOLID filter is set but no results, also search by keywords in description
         if filters.get('solid_filter') and not structured_results:
             # Search for entities with SOLID violations mentioned in description/keywords
-            solid_keywords = ['solid', 'нарушен', 'violation', 'responsibility', 'ответственн']
-            query_lower = query.lower()
-            if any(kw in query_lower for kw in solid_keywords):
-                solid_search = db.query(Entity, Analysis, File).join(
-                    Analysis, Entity.id == Analysis.entity_id
-                ).join(File, Entity.file_id == File.id).filter(
+            if SOLID_QUERY_KEYWORDS.search(query_lower):
+                solid_search = self._result_query(db).filter(
                     File.project_id == project_id,
                     Analysis.solid_violations.isnot(None),
                     or_(
@@ -378,99 +509,84 @@ class SearchService:
                 ).limit(10).all()
                 
                 for entity, analysis, file in solid_search:
-                    if entity.id not in seen_entity_ids:
-                        # Check if it matches the principle
-                        principle = filters['solid_filter'].get('principle')
-                        if principle is None or any(
-                            v.get('principle') == principle 
-                            for v in (analysis.solid_violations or [])
-                            if isinstance(v, dict)
-                        ):
-                            results.append(SearchResult(
-                                entity=self._entity_to_response(entity, file),
-                                analysis=self._analysis_to_response(analysis, entity, file),
-                                score=0.8,
-                                match_type="structured"
-                            ))
-                            seen_entity_ids.add(entity.id)
+                    # Check if it matches the principle
+                    principle = filters['solid_filter'].get('principle')
+                    if principle is None or any(
+                        v.get('principle') == principle 
+                        for v in analysis.solid_violations
+                        if isinstance(v, dict)
+                    ):
+                        self._merge_result(unique_results, self._build_hit(entity, analysis, file, 0.8, "structured"))
         
         # 3. Dependency-based search (if keyword search found relevant classes OR if query mentions dependencies)
         # Check if query mentions common dependency patterns (SQLAlchemy, db.query, etc.)
-        query_lower = query.lower()
-        dependency_keywords = ['sqlalchemy', 'db.query', 'db.add', 'db.commit', 'db.flush', 'db.delete', 
-                              'зависимост', 'dependency', 'использует', 'uses', 'вызывает', 'calls']
-        has_dependency_query = any(kw in query_lower for kw in dependency_keywords)
+        has_dependency_query = bool(DEPENDENCY_QUERY_KEYWORDS.search(query_lower))
         
         if keyword_results or has_dependency_query:
             dependency_results = self._dependency_search(db, query, keyword_results, filters, project_id, limit // 2, has_dependency_query)
             for result in dependency_results:
-                if result.entity.id not in seen_entity_ids:
-                    results.append(result)
-                    seen_entity_ids.add(result.entity.id)
+                self._merge_result(unique_results, result)
         
         # 4. Semantic search (Vector) - as fallback/complement
         # Only if we don't have enough results or for additional relevance
-        if len(results) < limit:
-            semantic_results = self._semantic_search(db, filters, project_id, limit - len(results))
+        if len(unique_results) < limit:
+            semantic_results = self._semantic_search(
+                db, filters, project_id, limit - len(unique_results), embedding=query_embedding,
+                qdrant_results=vector_future.result()
+            )
             for result in semantic_results:
-                if result.entity.id not in seen_entity_ids:
-                    results.append(result)
-                    seen_entity_ids.add(result.entity.id)
+                self._merge_result(unique_results, result)
         
-        # 5. Deduplicate and rank
-        unique_results = self._deduplicate_results(results)
-        ranked_results = self._rank_results(unique_results, query)
+        # 5. Rank, then build response models only for the returned slice
+        ranked_hits = self._rank_results(list(unique_results.values()), query_lower)[:limit]
+        ranked_results = [self._hit_to_result(hit) for hit in ranked_hits]
         
-        return ranked_results[:limit]
+        SemanticQueryCache.put(project_id, cache_key, query_embedding, limit, ranked_results)
+        return ranked_results
+    
+    def _find_enum_cases(
+        self,
+        db: Session,
+        project_id: int,
+        enum_names: List[str],
+        per_enum_limit: int = 10
+    ) -> List:
+        """Find enum cases for several enum classes with a single query
+        
+        Returns (entity, analysis, file) rows grouped by enum in the order of
+        enum_names, at most per_enum_limit cases per enum.
+        """
+        if not enum_names:
+            return []
+        
+        # One regex match on FQN instead of a LIKE '%Name::%' query per enum; the
+        # matched name partitions the cases, so the per-enum cap is applied in SQL
+        names_pattern = '(' + '|'.join(re.escape(name) for name in enum_names) + ')::'
+        enum_name = func.substring(Entity.full_qualified_name, names_pattern)
+        ranked = db.query(
+            Entity.id.label('entity_id'),
+            enum_name.label('enum_name'),
+            func.row_number().over(partition_by=enum_name, order_by=Entity.id).label('rn')
+        ).join(
+            Analysis, Entity.id == Analysis.entity_id
+        ).join(File, Entity.file_id == File.id).filter(
+            File.project_id == project_id,
+            Entity.type == 'constant',
+            Entity.full_qualified_name.op('~')(names_pattern)
+        ).subquery()
+        rows = self._result_query(db).add_columns(ranked.c.enum_name).join(
+            ranked, Entity.id == ranked.c.entity_id
+        ).filter(ranked.c.rn <= per_enum_limit).order_by(ranked.c.rn).all()
+        
+        grouped = {name: [] for name in enum_names}
+        for entity, analysis, file, name in rows:
+            grouped[name].append((entity, analysis, file))
+        
+        return [row for cases in grouped.values() for row in cases]
     
     def _normalize_query(self, query: str) -> List[str]:
         """Normalize query and extract keywords"""
-        # Remove common words and normalize
-        query_lower = query.lower()
-        
-        # Russian stop words
-        russian_stop_words = {'найти', 'все', 'для', 'которые', 'который', 'которую', 'которое'}
-        
-        # English stop words
-        english_stop_words = {'find', 'all', 'the', 'for', 'which', 'that'}
-        
-        stop_words = russian_stop_words | english_stop_words
-        
-        # Extract words (Russian and English)
-        words = re.findall(r'\b[а-яё]+|\b[a-z]+', query_lower)
-        
-        # Normalize Russian words (remove endings to get root forms)
-        normalized_words = []
-        for word in words:
-            # Skip entity type words (методы, классы) - they're used for filtering, not search
-            if word in {'методы', 'метод', 'классы', 'класс', 'функции', 'функция',
-                       'methods', 'method', 'classes', 'class', 'functions', 'function'}:
-                continue
-            
-            # Normalize Russian word endings to root forms
-            # Remove common endings: -ия, -ий, -ие, -ии, -ию, -ей, -ем, -ами, -ах
-            if len(word) > 4:
-                # Plural genitive/accusative: отправки -> отправк, сообщений -> сообщени
-                if word.endswith('ии') or word.endswith('ию'):
-                    word = word[:-2]
-                elif word.endswith('ий') or word.endswith('ие'):
-                    word = word[:-2]
-                elif word.endswith('ей') or word.endswith('ем'):
-                    word = word[:-2]
-                elif word.endswith('ами') or word.endswith('ах'):
-                    word = word[:-3]
-                elif word.endswith('ия'):
-                    word = word[:-2]
-                # Singular genitive: отправки -> отправк (if ends with и)
-                elif word.endswith('и') and len(word) > 5:
-                    word = word[:-1]
-            
-            normalized_words.append(word)
-        
-        # Filter out stop words and short words
-        keywords = [w for w in normalized_words if w not in stop_words and len(w) > 3]
-        
-        return keywords
+        return list(_normalize_query_keywords(query))
     
     def _keyword_search(
         self,
@@ -479,7 +595,7 @@ class SearchService:
         filters: Dict,
         project_id: Optional[int],
         limit: int
-    ) -> List[SearchResult]:
+    ) -> List[_RawHit]:
         """Search by keywords in names and descriptions - highest priority"""
         # Require project_id
         if not project_id:
@@ -491,131 +607,84 @@ class SearchService:
             return []
         
         # Build search query
-        search_query = db.query(Entity, Analysis, File).join(
-            Analysis, Entity.id == Analysis.entity_id
-        ).join(File, Entity.file_id == File.id)
+        search_query = self._result_query(db)
         
         # Always filter by project_id (required)
         search_query = search_query.filter(File.project_id == project_id)
         
         # Apply entity type filter if specified
         if filters.get('entity_type_filter'):
-            entity_type = filters['entity_type_filter']
-            if entity_type == 'enum':
-                # Filter for enum case values (constants with :: in full_qualified_name)
-                search_query = search_query.filter(
-                    Entity.type == 'constant',
-                    Entity.full_qualified_name.like('%::%')
-                )
-            else:
-                search_query = search_query.filter(Entity.type == entity_type)
-        
-        # Build OR conditions for keywords - search in name, full_qualified_name, analysis description, and keywords field
-        keyword_conditions = []
-        for keyword in keywords:
-            keyword_pattern = f"%{keyword}%"
-            keyword_conditions.append(
-                or_(
-                    Entity.name.ilike(keyword_pattern),
-                    Analysis.description.ilike(keyword_pattern),
-                    Entity.full_qualified_name.ilike(keyword_pattern),
-                    Analysis.keywords.ilike(keyword_pattern)  # Also search in keywords field
-                )
+            search_query = self._filter_entity_type(search_query, filters['entity_type_filter'])
+        
+        # Match any keyword in name, full_qualified_name, analysis description, or keywords field:
+        # one ILIKE ANY per column instead of 4 ILIKEs per keyword
+        # (each column has a pg_trgm GIN index, so the '%keyword%' patterns are index-backed)
+        keyword_patterns = array([f"%{keyword}%" for keyword in keywords])
+        search_query = search_query.filter(
+            or_(
+                Entity.name.ilike(any_(keyword_patterns)),
+                Analysis.description.ilike(any_(keyword_patterns)),
+                Entity.full_qualified_name.ilike(any_(keyword_patterns)),
+                Analysis.keywords.ilike(any_(keyword_patterns))  # Also search in keywords field
             )
+        )
         
-        if keyword_conditions:
-            search_query = search_query.filter(or_(*keyword_conditions))
-        
-        # Get results
-        entities = search_query.limit(limit * 2).all()
+        # Score, threshold and order in SQL so only the top candidates are fetched
+        score = self._keyword_score_expression(keywords)
+        entities = search_query.add_columns(score.label('keyword_score')).filter(
+            score >= 0.3  # At least 30% keyword match
+        ).order_by(score.desc()).limit(limit).all()
         
-        results = []
-        for entity, analysis, file in entities:
-            # Calculate keyword match score
-            score = self._calculate_keyword_score(entity, analysis, keywords)
-            
-            # Only include if score is high enough
-            if score >= 0.3:  # At least 30% keyword match
-                results.append(SearchResult(
-                    entity=self._entity_to_response(entity, file),
-                    analysis=self._analysis_to_response(analysis, entity, file),
-                    score=min(score, 1.0),  # Cap at 1.0
-                    match_type="keyword"
-                ))
-        
-        # Sort by score
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:limit]
-    
-    def _calculate_keyword_score(self, entity: Entity, analysis: Analysis, keywords: List[str]) -> float:
-        """Calculate relevance score based on keyword matches"""
-        score = 0.0
-        
-        # Build text to search including keywords field
-        text_parts = [
-            entity.name,
-            analysis.description if analysis else '',
-            entity.full_qualified_name or ''
+        return [
+            self._build_hit(entity, analysis, file, float(keyword_score), "keyword")
+            for entity, analysis, file, keyword_score in entities
         ]
+    
+    def _keyword_score_expression(self, keywords: List[str]):
+        """Build SQL expression for relevance score based on keyword matches
         
-        # Add keywords from analysis if available
-        if analysis and analysis.keywords:
-            text_parts.append(analysis.keywords)
-        
-        text_to_search = ' '.join(text_parts).lower()
-        
-        # Count keyword matches
-        matches = sum(1 for keyword in keywords if keyword in text_to_search)
-        
-        if matches == 0:
-            return 0.0
-        
-        # Base score: percentage of keywords found
-        base_score = matches / len(keywords)
-        
-        # Boost if keyword in name (more important)
-        name_lower = entity.name.lower()
-        name_matches = sum(1 for keyword in keywords if keyword in name_lower)
-        if name_matches > 0:
-            base_score += 0.3 * (name_matches / len(keywords))
-        
-        # Boost if keyword found in keywords field (high relevance)
-        if analysis and analysis.keywords:
-            keywords_lower = analysis.keywords.lower()
-            keywords_matches = sum(1 for keyword in keywords if keyword in keywords_lower)
-            if keywords_matches > 0:
-                base_score += 0.2 * (keywords_matches / len(keywords))
-        
-        # Boost if all keywords found
-        if matches == len(keywords):
-            base_score += 0.2
-        
-        return min(base_score, 1.0)
+        Base score is the share of keywords found in name, description, FQN or
+        keywords field, boosted for keywords in the name (+0.3 share) and in the
+        keywords field (+0.2 share), plus 0.2 if all keywords were found.
+        Capped at 1.0.
+        """
+        matches = 0
+        name_matches = 0
+        keywords_matches = 0
+        for keyword in keywords:
+            keyword_pattern = f"%{keyword}%"
+            in_name = Entity.name.ilike(keyword_pattern)
+            in_keywords = Analysis.keywords.ilike(keyword_pattern)
+            matches += case((or_(
+                in_name,
+                in_keywords,
+                Analysis.description.ilike(keyword_pattern),
+                Entity.full_qualified_name.ilike(keyword_pattern)
+            ), 1), else_=0)
+            name_matches += case((in_name, 1), else_=0)
+            keywords_matches += case((in_keywords, 1), else_=0)
+        
+        total = float(len(keywords))
+        base_score = (matches + 0.3 * name_matches + 0.2 * keywords_matches) / total
+        all_found_boost = case((matches == len(keywords), 0.2), else_=0.0)
+        return func.least(base_score + all_found_boost, 1.0)
     
     def _dependency_search(
         self,
         db: Session,
         query: str,
-        keyword_results: List[SearchResult],
+        keyword_results: List[_RawHit],
         filters: Dict,
         project_id: Optional[int],
         limit: int,
         has_dependency_query: bool = False
-    ) -> List[SearchResult]:
+    ) -> List[_RawHit]:
         """Search for methods that depend on classes found in keyword search or match dependency patterns"""
         
         # Require project_id for dependency search
         if not project_id:
             return []
         
-        # Get project language to filter language-specific dependencies
-        from app.models.database import Project
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            return []
-        
-        project_language = project.language.lower() if project.language else None
-        
         # Extract entity IDs from keyword results (focus on classes)
         relevant_entity_ids = set()
         relevant_class_names = set()
@@ -630,15 +699,25 @@ class SearchService:
                     if result.entity.full_qualified_name:
                         relevant_class_names.add(result.entity.full_qualified_name.lower())
         
+        # Nothing to search for: no classes found and no dependency patterns in the query
+        if not relevant_entity_ids and not has_dependency_query:
+            return []
+        
+        # Get project language to filter language-specific dependencies
+        project_language = self._get_project_language(db, project_id)
+        if project_language is None:
+            return []
+        
+        # Query keywords are shared by pattern extraction and result scoring
+        keywords = self._normalize_query(query)
+        
         # If query mentions dependencies directly, extract patterns
         if has_dependency_query:
             query_lower = query.lower()
             # Common SQLAlchemy patterns (Python only)
             if ('sqlalchemy' in query_lower or 'db.' in query_lower) and project_language == 'python':
-                dependency_patterns.update(['db.query', 'db.add', 'db.commit', 'db.flush', 'db.delete', 
-                                           'db.rollback', 'db.refresh', 'db.close', 'Session', 'session'])
+                dependency_patterns.update(SQLALCHEMY_DEPENDENCY_PATTERNS)
             # Extract other dependency keywords from query
-            keywords = self._normalize_query(query)
             dependency_patterns.update(keywords)
         
         if not relevant_entity_ids and not relevant_class_names and not dependency_patterns:
@@ -646,9 +725,7 @@ class SearchService:
         
         # Find entities that depend on these classes
         # Method 1: Direct dependencies via Dependency table
-        dependency_query = db.query(Entity, Analysis, File).join(
-            Analysis, Entity.id == Analysis.entity_id
-        ).join(File, Entity.file_id == File.id).join(
+        dependency_query = self._result_query(db).join(
             Dependency, Entity.id == Dependency.entity_id
         )
         
@@ -657,32 +734,21 @@ class SearchService:
         
         # Filter by entity type if specified
         if filters.get('entity_type_filter'):
-            entity_type = filters['entity_type_filter']
-            if entity_type == 'enum':
-                # Filter for enum case values (constants with :: in full_qualified_name)
-                dependency_query = dependency_query.filter(
-                    Entity.type == 'constant',
-                    Entity.full_qualified_name.like('%::%')
-                )
-            else:
-                dependency_query = dependency_query.filter(Entity.type == entity_type)
+            dependency_query = self._filter_entity_type(dependency_query, filters['entity_type_filter'])
         
         # Match by depends_on_entity_id or depends_on_name
         dependency_conditions = []
         if relevant_entity_ids:
             dependency_conditions.append(Dependency.depends_on_entity_id.in_(relevant_entity_ids))
         
-        if relevant_class_names:
-            for class_name in relevant_class_names:
-                dependency_conditions.append(Dependency.depends_on_name.ilike(f"%{class_name}%"))
-        
-        # Match by dependency patterns (e.g., db.query, SQLAlchemy methods)
-        if dependency_patterns:
-            pattern_conditions = []
-            for pattern in dependency_patterns:
-                pattern_conditions.append(Dependency.depends_on_name.ilike(f"%{pattern}%"))
-            if pattern_conditions:
-                dependency_conditions.append(or_(*pattern_conditions))
+        # Match class names and dependency patterns (e.g., db.query, SQLAlchemy methods)
+        # with a single ILIKE ANY, backed by the depends_on_name trigram index
+        # (ILIKE ignores case, so case variants like Session/session collapse into one pattern)
+        name_patterns = relevant_class_names | {pattern.lower() for pattern in dependency_patterns}
+        if name_patterns:
+            dependency_conditions.append(
+                Dependency.depends_on_name.ilike(any_(array([f"%{name}%" for name in name_patterns])))
+            )
         
         if dependency_conditions:
             dependency_query = dependency_query.filter(or_(*dependency_conditions))
@@ -697,34 +763,72 @@ class SearchService:
                 continue
             seen_ids.add(entity.id)
             
-            # Get dependency description for context
-            dependencies = db.query(Dependency).filter(Dependency.entity_id == entity.id).all()
             dependency_score = 0.5  # Base score for dependency match
             
             # Boost if dependency description is relevant
             if analysis and analysis.description:
-                keywords = self._normalize_query(query)
                 desc_lower = analysis.description.lower()
                 keyword_matches = sum(1 for kw in keywords if kw in desc_lower)
                 if keyword_matches > 0:
                     dependency_score += 0.2 * (keyword_matches / len(keywords)) if keywords else 0
             
-            results.append(SearchResult(
-                entity=self._entity_to_response(entity, file),
-                analysis=self._analysis_to_response(analysis, entity, file),
-                score=dependency_score,
-                match_type="dependency"
-            ))
+            results.append(self._build_hit(entity, analysis, file, dependency_score, "dependency"))
         
         return results
     
+    @staticmethod
+    def _semantic_cache_key(db: Session, query: str, project_id: int) -> tuple:
+        """Exact part of the SemanticQueryCache key for a query
+        
+        Embeddings of queries differing in a filter word (or a number) are often
+        above the similarity threshold, so the heuristic filters and normalized
+        keywords must match exactly.
+        
+        The project's updated_at is the invalidation mechanism: indexing runs in the
+        Celery worker, which can't reach this process's cache, but indexing, reindexing
+        and deletion all update the project row, so older entries never match again.
+        """
+        heuristic_filters = QueryAnalyzer._analyze_query_heuristics(query)
+        project_version = db.query(Project.updated_at).filter(Project.id == project_id).scalar()
+        return (
+            project_version,
+            _normalize_query_keywords(query),
+            tuple(
+                (name, repr(value)) for name, value in sorted(heuristic_filters.items())
+                if name != 'semantic_query'
+            ),
+        )
+    
+    def _get_project_language(self, db: Session, project_id: int) -> Optional[str]:
+        """Lowercased project language, or None if the project doesn't exist"""
+        with self._project_languages_lock:
+            language = self._project_languages.get(project_id)
+        if language is not None:
+            return language
+        
+        language = db.query(Project.language).filter(Project.id == project_id).scalar()
+        if language is None:
+            return None
+        
+        language = language.lower()
+        with self._project_languages_lock:
+            self._project_languages[project_id] = language
+        return language
+    
+    @classmethod
+    def forget_project(cls, project_id: int):
+        """Drop cached data for a deleted project"""
+        with cls._project_languages_lock:
+            cls._project_languages.pop(project_id, None)
+        SemanticQueryCache.invalidate(project_id)
+    
     def _structured_search(
         self,
         db: Session,
         filters: Dict,
         project_id: Optional[int],
         limit: int
-    ) -> List[SearchResult]:
+    ) -> List[_RawHit]:
         """Search using structured filters"""
         # Require project_id
         if not project_id:
@@ -748,26 +852,24 @@ class SearchService:
         if not has_filters and not (filters.get('mvc_role_filter') or filters.get('ddd_role_filter')):
             return []  # Don't return all entities if no filters
         
-        query = db.query(Entity, Analysis, File).join(
-            Analysis, Entity.id == Analysis.entity_id
-        ).join(File, Entity.file_id == File.id)
+        query = self._result_query(db)
         
         # Always filter by project_id (required)
         query = query.filter(File.project_id == project_id)
         
-        # Complexity filter
-        if filters.get('complexity_filter'):
-            cf = filters['complexity_filter']
-            if 'min' in cf:
-                query = query.filter(Analysis.complexity_numeric >= cf['min'])
-            if 'max' in cf:
-                query = query.filter(Analysis.complexity_numeric <= cf['max'])
+        # Complexity and MVC/DDD role filters
+        query = self._apply_analysis_filters(query, filters)
         
-        # SOLID filter - will be applied in Python after fetching
-        # Just ensure solid_violations is not empty
+        # SOLID filter
         if filters.get('solid_filter'):
+            principle = filters['solid_filter'].get('principle')
+            if principle is None:
+                # Match any SOLID violation (at least one violation object)
+                violation = [{}]
+            else:
+                violation = [{'principle': principle}]
             query = query.filter(
-                Analysis.solid_violations.isnot(None)
+                Analysis.solid_violations.op('@>')(cast(violation, JSONB))
             )
         
         # Testability filter
@@ -775,98 +877,37 @@ class SearchService:
             min_score = filters['testability_filter'].get('min_score', 0.5)
             query = query.filter(Analysis.testability_score >= min_score)
         
-        # Pattern filter - will be applied in Python after fetching
-        # Just ensure design_patterns is not empty
+        # Pattern filter (JSONB "?" - pattern is an element of design_patterns)
         if filters.get('pattern_filter'):
             query = query.filter(
-                Analysis.design_patterns.isnot(None)
+                Analysis.design_patterns.has_key(filters['pattern_filter'])
             )
         
-        # MVC role filter
-        if filters.get('mvc_role_filter'):
-            query = query.filter(
-                Analysis.mvc_role == filters['mvc_role_filter']
-            )
-        
-        # DDD role filter
-        if filters.get('ddd_role_filter'):
-            query = query.filter(
-                Analysis.ddd_role == filters['ddd_role_filter']
-            )
-        
-        entities = query.limit(limit * 2).all()  # Get more to filter
-        
-        results = []
-        for entity, analysis, file in entities:
-            # Apply entity type filter if specified (only if we have other filters)
-            if use_entity_type_filter:
-                entity_type = filters['entity_type_filter']
-                if entity_type == 'enum':
-                    # Check if it's an enum case value (constant with :: in full_qualified_name)
-                    if entity.type != 'constant' or '::' not in (entity.full_qualified_name or ''):
-                        continue
-                elif entity.type != entity_type:
-                    continue
-            
-            # Apply complexity filter in Python if needed
-            if filters.get('complexity_filter'):
-                cf = filters['complexity_filter']
-                complexity_num = analysis.complexity_numeric
-                
-                # Check min
-                if 'min' in cf and complexity_num < cf['min']:
-                    continue
-                
-                # Check max
-                if 'max' in cf and complexity_num > cf['max']:
-                    continue
-            
-            # Apply SOLID filter in Python if needed
-            if filters.get('solid_filter'):
-                principle = filters['solid_filter'].get('principle')
-                violations = analysis.solid_violations or []
-                
-                if principle is None:
-                    # Match any SOLID violation
-                    if not violations:
-                        continue
-                else:
-                    # Check if any violation matches the principle
-                    has_match = any(
-                        v.get('principle') == principle 
-                        for v in violations 
-                        if isinstance(v, dict)
-                    )
-                    if not has_match:
-                        continue
-            
-            # Apply pattern filter in Python if needed
-            if filters.get('pattern_filter'):
-                pattern = filters['pattern_filter']
-                patterns = analysis.design_patterns or []
-                if pattern not in patterns:
-                    continue
-            
-            results.append(SearchResult(
-                entity=self._entity_to_response(entity, file),
-                analysis=self._analysis_to_response(analysis, entity, file),
-                score=1.0,
-                match_type="structured"
-            ))
-            
-            if len(results) >= limit:
-                break
+        # Entity type filter (only if we have other filters)
+        if use_entity_type_filter:
+            query = self._filter_entity_type(query, filters['entity_type_filter'])
         
-        return results
+        # All filters run in SQL, so exactly `limit` rows are fetched
+        return [
+            self._build_hit(entity, analysis, file, 1.0, "structured")
+            for entity, analysis, file in query.limit(limit).all()
+        ]
     
     def _semantic_search(
         self,
         db: Session,
         filters: Dict,
         project_id: Optional[int],
-        limit: int
-    ) -> List[SearchResult]:
-        """Search using semantic similarity"""
+        limit: int,
+        embedding: Optional[List[float]] = None,
+        qdrant_results: Optional[List[dict]] = None
+    ) -> List[_RawHit]:
+        """Search using semantic similarity
+        
+        Args:
+            embedding: Precomputed embedding of the semantic query, if available
+            qdrant_results: Prefetched Qdrant hits (best first, at least limit * 2), if available
+        """
         # Require project_id
         if not project_id:
             return []
@@ -876,17 +917,14 @@ class SearchService:
             return []
         
         # Generate embedding
-        embedding = self.embedding_service.generate_embedding(semantic_query)
-        
-        # Search in Qdrant
-        qdrant_filter = {}
-        # Get file IDs for project (required)
-        file_ids = db.query(File.id).filter(File.project_id == project_id).all()
-        file_ids = [f[0] for f in file_ids]
-        # Note: Qdrant filter would need file_id in payload
-        # For now, we'll filter after search
+        if embedding is None:
+            embedding = self.embedding_service.generate_query_embedding(semantic_query)
         
-        qdrant_results = self.qdrant.search(embedding, limit=limit * 2, filter=qdrant_filter if qdrant_filter else None)
+        # Search in Qdrant, scoped to the project by payload filter
+        if qdrant_results is None:
+            qdrant_results = self.qdrant.search(embedding, limit=limit * 2, project_id=project_id)
+        else:
+            qdrant_results = qdrant_results[:limit * 2]
         
         # Filter by minimum relevance score (0.5 threshold for better quality)
         # Higher threshold to reduce false positives
@@ -899,129 +937,103 @@ class SearchService:
         # Get entities from DB
         entity_ids = [r['payload']['entity_id'] for r in relevant_results]
         
-        entities = db.query(Entity, Analysis, File).join(
-            Analysis, Entity.id == Analysis.entity_id
-        ).join(File, Entity.file_id == File.id).filter(
-            Entity.id.in_(entity_ids)
-        ).all()
+        # Rows come back in Qdrant order (best match first)
+        qdrant_rank = case({entity_id: rank for rank, entity_id in enumerate(entity_ids)}, value=Entity.id)
+        query = self._result_query(db).filter(
+            Entity.id.in_(entity_ids),
+            File.project_id == project_id
+        ).order_by(qdrant_rank)
+        
+        # Apply entity type filter if specified
+        if filters.get('entity_type_filter'):
+            query = self._filter_entity_type(query, filters['entity_type_filter'])
         
-        # Filter by project if needed
-        if project_id:
-            entities = [(e, a, f) for e, a, f in entities if f.project_id == project_id]
+        # Apply complexity and MVC/DDD role filters
+        query = self._apply_analysis_filters(query, filters)
         
         # Create results with scores
-        results = []
         score_map = {r['payload']['entity_id']: r['score'] for r in relevant_results}
+        return [
+            self._build_hit(entity, analysis, file, float(score_map.get(entity.id, 0.0)), "semantic")
+            for entity, analysis, file in query.all()
+        ]
+    
+    def _filter_entity_type(self, query, entity_type: str):
+        """Restrict query to an entity type ('enum' means enum case values)"""
+        if entity_type == 'enum':
+            # Filter for enum case values (flag set at indexing time, indexed)
+            return query.filter(Entity.is_enum_case == True)
+        return query.filter(Entity.type == entity_type)
+    
+    def _apply_analysis_filters(self, query, filters: Dict):
+        """Apply complexity and MVC/DDD role filters to a query joined with Analysis"""
+        if filters.get('complexity_filter'):
+            cf = filters['complexity_filter']
+            if 'min' in cf:
+                query = query.filter(Analysis.complexity_numeric >= cf['min'])
+            if 'max' in cf:
+                query = query.filter(Analysis.complexity_numeric <= cf['max'])
         
-        for entity, analysis, file in entities:
-            # Apply entity type filter if specified
-            if filters.get('entity_type_filter'):
-                entity_type = filters['entity_type_filter']
-                if entity_type == 'enum':
-                    # Check if it's an enum case value (constant with :: in full_qualified_name)
-                    if entity.type != 'constant' or '::' not in (entity.full_qualified_name or ''):
-                        continue
-                elif entity.type != entity_type:
-                    continue
-            
-            # Apply MVC role filter if specified
-            if filters.get('mvc_role_filter'):
-                if analysis.mvc_role != filters['mvc_role_filter']:
-                    continue
-            
-            # Apply DDD role filter if specified
-            if filters.get('ddd_role_filter'):
-                if analysis.ddd_role != filters['ddd_role_filter']:
-                    continue
-            
-            # Apply complexity filter if specified
-            if filters.get('complexity_filter'):
-                cf = filters['complexity_filter']
-                complexity_num = analysis.complexity_numeric
-                
-                # Check min
-                if 'min' in cf and complexity_num < cf['min']:
-                    continue
-                
-                # Check max
-                if 'max' in cf and complexity_num > cf['max']:
-                    continue
-            
-            score = score_map.get(entity.id, 0.0)
-            results.append(SearchResult(
-                entity=self._entity_to_response(entity, file),
-                analysis=self._analysis_to_response(analysis, entity, file),
-                score=float(score),
-                match_type="semantic"
-            ))
+        if filters.get('mvc_role_filter'):
+            query = query.filter(Analysis.mvc_role == filters['mvc_role_filter'])
         
-        return results
+        if filters.get('ddd_role_filter'):
+            query = query.filter(Analysis.ddd_role == filters['ddd_role_filter'])
+        
+        return query
     
-    def _deduplicate_results(self, results: List[SearchResult]) -> List[SearchResult]:
-        """Remove duplicate results based on unique key (name, file_path, start_line, end_line)
+    def _merge_result(self, unique: Dict[tuple, _RawHit], result: _RawHit):
+        """Add result to unique, resolving duplicates in place
         
-        This prevents showing the same entity multiple times even if it has different entity_ids
+        Duplicates are detected by entity properties (not entity_id), which prevents
+        showing the same entity multiple times even if it has different entity_ids
         (which happens when entities are indexed multiple times)
         """
-        seen = {}  # key: (name, file_path, start_line, end_line) -> SearchResult
-        unique = []
-        
-        for result in results:
-            # Create unique key from entity properties (not entity_id)
-            # For constants, use name + file_path only (start_line may vary)
-            # For other entities, use name + file_path + start_line + end_line
-            if result.entity.type == 'constant':
-                unique_key = (
-                    result.entity.name,
-                    result.entity.file_path,
-                    result.entity.type
-                )
-            else:
-                unique_key = (
-                    result.entity.name,
-                    result.entity.file_path,
-                    result.entity.start_line,
-                    result.entity.end_line
-                )
-            
-            if unique_key not in seen:
-                seen[unique_key] = result
-                unique.append(result)
-            else:
-                # Merge scores if duplicate - keep the one with higher score
-                existing = seen[unique_key]
-                if result.score > existing.score:
-                    # Replace with better scoring result
-                    unique.remove(existing)
-                    seen[unique_key] = result
-                    unique.append(result)
-                elif result.entity.id < existing.entity.id:
-                    # If scores are equal, keep the one with lower ID (older, more likely to be the original)
-                    unique.remove(existing)
-                    seen[unique_key] = result
-                    unique.append(result)
-                else:
-                    # Keep existing, but update score if needed
-                    existing.score = max(existing.score, result.score)
-                    if result.match_type == "semantic" and existing.match_type != "hybrid":
-                        existing.match_type = "hybrid"
-        
-        return unique
+        # For constants, use name + file_path only (start_line may vary)
+        # For other entities, use name + file_path + start_line + end_line
+        entity = result.entity
+        file_path = result.file.path
+        if entity.type == 'constant':
+            unique_key = (entity.name, file_path, entity.type)
+        else:
+            unique_key = (entity.name, file_path, entity.start_line, entity.end_line)
+        
+        # First occurrence is stored with a single dict operation
+        existing = unique.setdefault(unique_key, result)
+        if existing is result:
+            return
+        elif existing.entity.id == entity.id:
+            # Same entity found by another search branch - first occurrence wins
+            return
+        elif result.score > existing.score or entity.id < existing.entity.id:
+            # Replace with better scoring result, or with the lower ID
+            # (older, more likely to be the original)
+            unique[unique_key] = result
+        else:
+            # Keep existing, but update score if needed
+            existing.score = max(existing.score, result.score)
+            if result.match_type == "semantic" and existing.match_type != "hybrid":
+                existing.match_type = "hybrid"
     
-    def _rank_results(self, results: List[SearchResult], query: str) -> List[SearchResult]:
-        """Rank results by relevance"""
-        query_lower = query.lower()
+    def _rank_results(self, results: List[_RawHit], query_lower: str) -> List[_RawHit]:
+        """Rank results by relevance
         
-        # Extract key terms from query (Russian and English)
-        key_terms = []
-        if 'отправк' in query_lower or 'send' in query_lower or 'сообщени' in query_lower or 'message' in query_lower:
-            key_terms.extend(['отправк', 'send', 'сообщени', 'message'])
-        if 'метод' in query_lower or 'method' in query_lower:
-            key_terms.extend(['метод', 'method'])
-        if 'статус' in query_lower or 'status' in query_lower:
-            key_terms.extend(['статус', 'status'])
+        Args:
+            results: Search results
+            query_lower: Lowercased search query
+        """
+        if len(results) < 2:
+            return results
+        
+        # Extract key terms from query (Russian and English), once per ranking
+        key_terms = tuple(
+            term
+            for group in RANK_KEY_TERM_GROUPS if any(term in query_lower for term in group)
+            for term in group
+        )
+        is_status_query = 'статус' in query_lower or 'status' in query_lower
         
-        def score_result(result: SearchResult) -> float:
+        def score_result(result: _RawHit) -> float:
             score = result.score
             
             # Boost if name matches
@@ -1030,7 +1042,7 @@ class SearchService:
                 score += 0.3
             
             # Special boost for enum/status-related entities when query is about statuses
-            if 'статус' in query_lower or 'status' in query_lower:
+            if is_status_query:
                 if 'status' in entity_name_lower or 'статус' in entity_name_lower:
                     score += 0.4  # Strong boost for status-related entities
                 if result.entity.type == 'class' and 'status' in entity_name_lower:
@@ -1059,9 +1071,57 @@ class SearchService:
         
         return sorted(results, key=score_result, reverse=True)
     
+    def _result_query(self, db: Session):
+        """Base (entity, analysis, file) query loading only the columns used in results
+        
+        Entity.code and the extended analysis metrics are never part of a search
+        result, so they are not transferred or hydrated.
+        """
+        return db.query(Entity, Analysis, File).join(
+            Analysis, Entity.id == Analysis.entity_id
+        ).join(File, Entity.file_id == File.id).options(
+            load_only(
+                Entity.id, Entity.type, Entity.name, Entity.start_line, Entity.end_line,
+                Entity.visibility, Entity.full_qualified_name
+            ),
+            load_only(
+                Analysis.id, Analysis.entity_id, Analysis.description, Analysis.complexity,
+                Analysis.complexity_numeric, Analysis.solid_violations, Analysis.design_patterns,
+                Analysis.ddd_role, Analysis.mvc_role, Analysis.is_testable, Analysis.testability_score,
+                Analysis.testability_issues, Analysis.keywords
+            ),
+            load_only(File.id, File.path)
+        )
+    
+    def _build_hit(
+        self,
+        entity: Entity,
+        analysis: Analysis,
+        file: File,
+        score: float,
+        match_type: str
+    ) -> _RawHit:
+        """Wrap a joined (entity, analysis, file) row as a search hit"""
+        return _RawHit(entity=entity, analysis=analysis, file=file, score=score, match_type=match_type)
+    
+    def _hit_to_result(self, hit: _RawHit) -> SearchResult:
+        """Convert a search hit to a search result
+        
+        Response models are built with model_construct: values come from typed
+        DB columns, so validation would only repeat what the schema guarantees.
+        """
+        # Build the entity response once and share it with the analysis response
+        entity_response = self._entity_to_response(hit.entity, hit.file)
+        return SearchResult.model_construct(
+            entity=entity_response,
+            analysis=self._analysis_to_response(hit.analysis, hit.entity, hit.file, entity_response),
+            score=hit.score,
+            match_type=hit.match_type
+        )
+    
     def _entity_to_response(self, entity: Entity, file: File) -> EntityResponse:
         """Convert Entity to response model"""
-        return EntityResponse(
+        return EntityResponse.model_construct(
             id=entity.id,
             type=entity.type,
             name=entity.name,
@@ -1076,22 +1136,23 @@ class SearchService:
         self,
         analysis: Analysis,
         entity: Entity,
-        file: File
+        file: File,
+        entity_response: Optional[EntityResponse] = None
     ) -> AnalysisResponse:
         """Convert Analysis to response model"""
-        return AnalysisResponse(
+        return AnalysisResponse.model_construct(
             id=analysis.id,
             description=analysis.description,
             complexity=analysis.complexity,
             complexity_numeric=analysis.complexity_numeric,
-            solid_violations=analysis.solid_violations or [],
-            design_patterns=analysis.design_patterns or [],
+            solid_violations=analysis.solid_violations,
+            design_patterns=analysis.design_patterns,
             ddd_role=analysis.ddd_role,
             mvc_role=analysis.mvc_role,
             is_testable=analysis.is_testable,
             testability_score=analysis.testability_score,
-            testability_issues=analysis.testability_issues or [],
-            entity=self._entity_to_response(entity, file),
+            testability_issues=analysis.testability_issues,
+            entity=entity_response or self._entity_to_response(entity, file),
             keywords=analysis.keywords
         )
 
@@ -0,0 +1,120 @@
+"""Semantic cache of search results keyed by query embedding similarity"""
+import logging
+import threading
+import time
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticQueryCache:
+    """Reuses search results for queries whose embeddings are near-identical
+
+    Entries are scoped per project and compared only within the same exact key
+    (the parts of the query that the embedding can't be trusted to tell apart,
+    e.g. extracted filters) and limit; a larger run's top results are not the
+    same as a smaller run's, since the search branches are sized by limit.
+    A lookup hits when the cosine similarity between the new query embedding
+    and a cached one is above SIMILARITY_THRESHOLD among entries younger than
+    TTL_SECONDS. Least recently used entries are evicted first.
+
+    Stale results are not invalidated by the indexer (it runs in the Celery
+    worker, not in the API process); callers put a data version in the key.
+    """
+
+    # Class-level cache: project_id -> vectors matrix and aligned entries
+    _vectors: Dict[int, np.ndarray] = {}
+    _entries: Dict[int, List[dict]] = {}
+    _lock = threading.Lock()
+
+    SIMILARITY_THRESHOLD = 0.95
+    TTL_SECONDS = 300
+    MAX_ENTRIES_PER_PROJECT = 1024
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @classmethod
+    def _similarities(
+        cls, project_id: int, key: Hashable, limit: int, vector: np.ndarray, usable
+    ) -> Optional[np.ndarray]:
+        """Cosine similarities to the project's entries; -inf where the entry can't be used"""
+        vectors = cls._vectors.get(project_id)
+        if vectors is None or not len(vectors):
+            return None
+
+        entries = cls._entries[project_id]
+        mask = np.fromiter(
+            (entry['key'] == key and entry['limit'] == limit and usable(entry) for entry in entries),
+            dtype=bool, count=len(entries)
+        )
+        # Embeddings are unit length, so the dot product is the cosine similarity
+        return np.where(mask, vectors @ vector, -np.inf)
+
+    @classmethod
+    def get(cls, project_id: int, key: Hashable, embedding: List[float], limit: int) -> Optional[list]:
+        """Return cached results for a similar query with the same key and limit, or None on miss"""
+        vector = cls._normalize(embedding)
+        now = time.monotonic()
+
+        def usable(entry: dict) -> bool:
+            return now - entry['created_at'] <= cls.TTL_SECONDS
+
+        with cls._lock:
+            similarities = cls._similarities(project_id, key, limit, vector, usable)
+            if similarities is None:
+                return None
+
+            best = int(np.argmax(similarities))
+            if similarities[best] < cls.SIMILARITY_THRESHOLD:
+                return None
+
+            entry = cls._entries[project_id][best]
+            entry['last_used'] = now
+            logger.debug(f"Semantic query cache hit for project {project_id} (similarity {similarities[best]:.3f})")
+            return list(entry['results'])
+
+    @classmethod
+    def put(cls, project_id: int, key: Hashable, embedding: List[float], limit: int, results: list):
+        """Store results for a query embedding (replacing a near-identical entry with the same key and limit)"""
+        vector = cls._normalize(embedding)
+        now = time.monotonic()
+        entry = {'key': key, 'results': list(results), 'limit': limit, 'created_at': now, 'last_used': now}
+
+        with cls._lock:
+            similarities = cls._similarities(project_id, key, limit, vector, lambda _: True)
+            if similarities is not None:
+                best = int(np.argmax(similarities))
+                if similarities[best] >= cls.SIMILARITY_THRESHOLD:
+                    # Refresh the expired entry in place
+                    cls._vectors[project_id][best] = vector
+                    cls._entries[project_id][best] = entry
+                    return
+
+            vectors = cls._vectors.get(project_id)
+            entries = cls._entries.setdefault(project_id, [])
+
+            if vectors is not None and len(entries) >= cls.MAX_ENTRIES_PER_PROJECT:
+                # Evict the least recently used entry
+                lru_index = min(range(len(entries)), key=lambda i: entries[i]['last_used'])
+                vectors = np.delete(vectors, lru_index, axis=0)
+                del entries[lru_index]
+
+            cls._vectors[project_id] = vector[np.newaxis, :] if vectors is None else np.vstack([vectors, vector])
+            entries.append(entry)
+
+    @classmethod
+    def invalidate(cls, project_id: Optional[int] = None):
+        """Drop cached results for a project (or for all projects)"""
+        with cls._lock:
+            if project_id is None:
+                cls._vectors.clear()
+                cls._entries.clear()
+            else:
+                cls._vectors.pop(project_id, None)
+                cls._entries.pop(project_id, None)
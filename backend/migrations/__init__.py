@@ -0,0 +1 @@
+"""Database migration scripts (run as python -m migrations.<name> from the backend directory)"""
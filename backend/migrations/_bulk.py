@@ -0,0 +1,29 @@
+"""
+Batched backfill helpers shared by migration scripts
+(use these instead of per-row UPDATEs or ORM dirty tracking)
+"""
+from typing import Iterable, Tuple, Any
+from psycopg2.extras import execute_values
+
+def bulk_update(db, table: str, key_col: str, value_col: str, pairs: Iterable[Tuple[Any, Any]], chunk: int = 1000) -> int:
+    """Set value_col for rows matched by key_col from (key, value) pairs
+    
+    Pairs are sent as VALUES lists of up to `chunk` rows per statement, on the
+    session's own connection, so the update joins the caller's transaction
+    (the caller commits). Returns the number of pairs sent.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        execute_values(
+            cursor,
+            f"UPDATE {table} SET {value_col} = data.v FROM (VALUES %s) AS data(k, v) WHERE {table}.{key_col} = data.k",
+            pairs,
+            page_size=chunk,
+        )
+    finally:
+        cursor.close()
+    return len(pairs)
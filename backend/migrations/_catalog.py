@@ -0,0 +1,29 @@
+"""
+Cached catalog lookups shared by migration scripts
+(one information_schema query per table per process)
+"""
+from typing import Dict, Optional
+from sqlalchemy import text
+
+# table name -> {column name: data type}
+_columns_cache: Dict[str, Dict[str, str]] = {}
+
+def get_columns(db, table: str) -> Dict[str, str]:
+    """Return column name -> data type for a table"""
+    columns = _columns_cache.get(table)
+    if columns is None:
+        result = db.execute(text("""
+            SELECT column_name, data_type 
+            FROM information_schema.columns 
+            WHERE table_name=:table
+        """), {"table": table})
+        columns = {name: data_type for name, data_type in result}
+        _columns_cache[table] = columns
+    return columns
+
+def forget_columns(table: Optional[str] = None):
+    """Drop cached columns after a table was altered (or for all tables)"""
+    if table is None:
+        _columns_cache.clear()
+    else:
+        _columns_cache.pop(table, None)
@@ -0,0 +1,68 @@
+"""
+Registry of applied migrations (schema_migrations table),
+so re-running the full set skips migrations that already completed
+"""
+import argparse
+import functools
+from app.core.database import SessionLocal
+from sqlalchemy import text
+
+def ensure_table(db):
+    """Create the schema_migrations table if it doesn't exist"""
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMPTZ DEFAULT now()
+        )
+    """))
+
+def is_applied(db, name: str) -> bool:
+    result = db.execute(text("SELECT 1 FROM schema_migrations WHERE name = :name"), {"name": name})
+    return result.scalar() is not None
+
+def mark_applied(db, name: str):
+    db.execute(text("""
+        INSERT INTO schema_migrations (name) VALUES (:name)
+        ON CONFLICT (name) DO UPDATE SET applied_at = now()
+    """), {"name": name})
+
+def migration(name: str):
+    """Wrap migrate(): skip it when already recorded as applied, record it after success
+    
+    Pass force=True to run a recorded migration again. A migrate() that returns
+    False did not complete (e.g. a missing table) and is not recorded.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, force: bool = False, **kwargs):
+            db = SessionLocal()
+            try:
+                ensure_table(db)
+                applied = is_applied(db, name)
+                db.commit()
+                if applied and not force:
+                    print(f"Migration {name} already applied (run with --force to re-run)")
+                    return None
+                
+                result = func(*args, **kwargs)
+                if result is False:
+                    print(f"Migration {name} not completed, not recorded as applied")
+                    return result
+                
+                mark_applied(db, name)
+                db.commit()
+                return result
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return wrapper
+    return decorator
+
+def run_cli(migrate):
+    """Run a migration from its __main__ block (--force re-runs an applied migration)"""
+    parser = argparse.ArgumentParser(description=migrate.__doc__)
+    parser.add_argument('--force', action='store_true', help='run even if already recorded as applied')
+    args = parser.parse_args()
+    migrate(force=args.force)
@@ -0,0 +1,20 @@
+"""
+Transaction helpers shared by migration scripts
+"""
+from contextlib import contextmanager
+
+@contextmanager
+def short_ddl_txn(db):
+    """Run DDL statements in a transaction of their own
+    
+    Ends the transaction opened by earlier catalog probes first, so the
+    table lock taken by the DDL is held only for the statements inside
+    the block, and commits right after them.
+    """
+    db.commit()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -2,43 +2,13 @@
 Migration script to add indexing status fields to projects table
 Run: docker-compose exec -T backend python -m migrations.add_indexing_status_fields
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from app.core.database import SessionLocal
-from sqlalchemy import text
+from migrations.consolidate_projects_columns import add_projects_columns
+from migrations._registry import migration, run_cli
 
+@migration('add_indexing_status_fields')
 def migrate():
     """Add indexing status columns to projects table"""
-    db = SessionLocal()
-    try:
-        # Check if columns exist
-        result = db.execute(text("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name='projects' AND column_name='current_file_path'
-        """))
-        
-        if result.fetchone():
-            print("Columns already exist")
-            return
-        
-        # Add columns
-        db.execute(text("""
-            ALTER TABLE projects 
-            ADD COLUMN current_file_path VARCHAR(512),
-            ADD COLUMN indexing_status TEXT
-        """))
-        db.commit()
-        print("Successfully added indexing status columns")
-    except Exception as e:
-        db.rollback()
-        print(f"Error: {e}")
-        raise
-    finally:
-        db.close()
+    add_projects_columns(['current_file_path', 'indexing_status'])
 
 if __name__ == "__main__":
-    migrate()
-
+    run_cli(migrate)
@@ -0,0 +1,53 @@
+"""
+Migration script to add is_enum_case flag to entities table
+Run: docker-compose exec -T backend python -m migrations.add_is_enum_case
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._catalog import get_columns, forget_columns
+from migrations._util import short_ddl_txn
+from migrations._registry import migration, run_cli
+
+@migration('add_is_enum_case')
+def migrate():
+    """Add is_enum_case column, backfill it and index it"""
+    db = SessionLocal()
+    try:
+        # Check if column already exists
+        if 'is_enum_case' in get_columns(db, 'entities'):
+            print("is_enum_case column already exists")
+            return
+        
+        with short_ddl_txn(db):
+            db.execute(text("""
+                ALTER TABLE entities 
+                ADD COLUMN is_enum_case BOOLEAN DEFAULT FALSE
+            """))
+        forget_columns('entities')
+        print("Added column: is_enum_case")
+        
+        # Enum case values are constants with :: in full_qualified_name
+        result = db.execute(text("""
+            UPDATE entities 
+            SET is_enum_case = (type = 'constant' AND COALESCE(full_qualified_name, '') LIKE '%::%')
+        """))
+        db.commit()
+        print(f"Backfilled is_enum_case for {result.rowcount} entities")
+        
+        with short_ddl_txn(db):
+            db.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_entity_enum_case 
+                ON entities (is_enum_case)
+            """))
+        print("Created index: idx_entity_enum_case")
+        
+        print("Successfully added is_enum_case column")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
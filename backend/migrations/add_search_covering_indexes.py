@@ -0,0 +1,35 @@
+"""
+Migration script to add covering indexes for the project -> files -> entities
+joins used by search
+Run: docker-compose exec -T backend python -m migrations.add_search_covering_indexes
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._registry import migration, run_cli
+
+# analysis.entity_id (unique) and dependencies.entity_id are already indexed
+COVERING_INDEXES = {
+    'idx_file_project_covering': "files (project_id) INCLUDE (id)",
+    'idx_entity_file_covering': "entities (file_id) INCLUDE (id, type, is_enum_case)",
+}
+
+@migration('add_search_covering_indexes')
+def migrate():
+    """Create covering indexes for search joins"""
+    db = SessionLocal()
+    try:
+        for index_name, definition in COVERING_INDEXES.items():
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {definition}"))
+            print(f"Ensured index: {index_name}")
+        
+        db.commit()
+        print("Successfully added covering indexes")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
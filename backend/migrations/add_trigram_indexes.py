@@ -0,0 +1,54 @@
+"""
+Migration script to add pg_trgm GIN indexes used by keyword search
+Run: docker-compose exec -T backend python -m migrations.add_trigram_indexes
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._registry import migration, run_cli
+
+# index name -> (table, column)
+TRIGRAM_INDEXES = {
+    'idx_entity_name_trgm': ('entities', 'name'),
+    'idx_entity_fqn_trgm': ('entities', 'full_qualified_name'),
+    'idx_analysis_description_trgm': ('analysis', 'description'),
+    'idx_analysis_keywords_trgm': ('analysis', 'keywords'),
+    'idx_dependency_name_trgm': ('dependencies', 'depends_on_name'),
+}
+
+@migration('add_trigram_indexes')
+def migrate():
+    """Enable pg_trgm and create trigram indexes for ILIKE keyword matching"""
+    db = SessionLocal()
+    try:
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        print("Enabled extension: pg_trgm")
+        
+        for index_name, (table, column) in TRIGRAM_INDEXES.items():
+            # Check if index already exists
+            result = db.execute(text("""
+                SELECT indexname 
+                FROM pg_indexes 
+                WHERE tablename=:table AND indexname=:index_name
+            """), {"table": table, "index_name": index_name})
+            
+            if result.fetchone():
+                print(f"Index {index_name} already exists")
+                continue
+            
+            db.execute(text(f"""
+                CREATE INDEX {index_name} 
+                ON {table} USING gin ({column} gin_trgm_ops)
+            """))
+            print(f"Created index: {index_name}")
+        
+        db.commit()
+        print("Successfully added trigram indexes")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
@@ -0,0 +1,56 @@
+"""
+Migration script to make analysis list columns NOT NULL with an empty-array default
+Run: docker-compose exec -T backend python -m migrations.analysis_list_columns_not_null
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._util import short_ddl_txn
+from migrations._registry import migration, run_cli
+
+# column -> column type (testability_issues is still plain JSON)
+LIST_COLUMNS = {
+    'solid_violations': 'jsonb',
+    'design_patterns': 'jsonb',
+    'testability_issues': 'json',
+    'security_issues': 'jsonb',
+    'n_plus_one_queries': 'jsonb',
+}
+
+def _is_empty(column: str) -> str:
+    # SQL NULL, or a JSON null written for a Python None
+    return f"({column} IS NULL OR jsonb_typeof({column}::jsonb) = 'null')"
+
+@migration('analysis_list_columns_not_null')
+def migrate():
+    """Backfill NULL list columns with [] and add NOT NULL with a '[]' default"""
+    db = SessionLocal()
+    try:
+        # One pass over the table backfills all columns
+        assignments = ",\n".join(
+            f"{column} = CASE WHEN {_is_empty(column)} THEN '[]'::{column_type} ELSE {column} END"
+            for column, column_type in LIST_COLUMNS.items()
+        )
+        condition = " OR ".join(_is_empty(column) for column in LIST_COLUMNS)
+        with short_ddl_txn(db):
+            result = db.execute(text(f"UPDATE analysis SET {assignments} WHERE {condition}"))
+        print(f"Backfilled {result.rowcount} analysis rows")
+        
+        # One ALTER TABLE validates all NOT NULL constraints in a single scan
+        clauses = ",\n".join(
+            f"ALTER COLUMN {column} SET DEFAULT '[]'::{column_type}, ALTER COLUMN {column} SET NOT NULL"
+            for column, column_type in LIST_COLUMNS.items()
+        )
+        with short_ddl_txn(db):
+            db.execute(text(f"ALTER TABLE analysis {clauses}"))
+        print(f"Set NOT NULL DEFAULT '[]' on: {', '.join(LIST_COLUMNS)}")
+        
+        print("Successfully updated analysis list columns")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
@@ -0,0 +1,48 @@
+"""
+Migration script to add project_id to payload of existing Qdrant points
+(semantic search filters points by project_id)
+Run: docker-compose exec -T backend python -m migrations.backfill_qdrant_project_id
+"""
+from app.core.database import SessionLocal
+from app.services.qdrant_service import QdrantService
+from sqlalchemy import text
+from migrations._registry import migration, run_cli
+
+BATCH_SIZE = 1000
+
+@migration('backfill_qdrant_project_id')
+def migrate():
+    """Set project_id payload on all indexed points and index the field"""
+    db = SessionLocal()
+    try:
+        qdrant = QdrantService()
+        qdrant.ensure_project_index()
+        print("Ensured payload index: project_id")
+        
+        result = db.execute(text("""
+            SELECT f.project_id, a.embedding_id 
+            FROM analysis a 
+            JOIN entities e ON e.id = a.entity_id 
+            JOIN files f ON f.id = e.file_id 
+            WHERE a.embedding_id IS NOT NULL 
+            ORDER BY f.project_id
+        """))
+        
+        points_by_project = {}
+        for project_id, embedding_id in result:
+            points_by_project.setdefault(project_id, []).append(int(embedding_id))
+        
+        for project_id, point_ids in points_by_project.items():
+            for start in range(0, len(point_ids), BATCH_SIZE):
+                qdrant.set_payload(point_ids[start:start + BATCH_SIZE], {"project_id": project_id})
+            print(f"Project {project_id}: set project_id on {len(point_ids)} points")
+        
+        print("Successfully backfilled project_id in Qdrant payloads")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
@@ -0,0 +1,111 @@
+"""
+Migration script to create tables and add columns in one run
+(supersedes the per-field scripts, which now delegate here; every statement is idempotent)
+Run: docker-compose exec -T backend python -m migrations.bootstrap
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._registry import migration, run_cli
+
+# table name -> CREATE TABLE statement
+TABLES = {
+    'llm_providers': """
+        CREATE TABLE IF NOT EXISTS llm_providers (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(50) NOT NULL UNIQUE,
+            display_name VARCHAR(100) NOT NULL,
+            base_url VARCHAR(255),
+            api_key VARCHAR(512),
+            is_active BOOLEAN DEFAULT TRUE,
+            is_default BOOLEAN DEFAULT FALSE,
+            config JSONB DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+}
+
+# table name -> {column name: definition}
+# (a constant DEFAULT fills existing rows without a table rewrite on PostgreSQL 11+)
+COLUMNS = {
+    'llm_providers': {
+        'model': "VARCHAR(100)",
+    },
+    'projects': {
+        'total_files': "INTEGER NOT NULL DEFAULT 0",
+        'indexed_files': "INTEGER NOT NULL DEFAULT 0",
+        'total_entities': "INTEGER NOT NULL DEFAULT 0",
+        'tokens_used': "INTEGER NOT NULL DEFAULT 0",
+        'ui_language': "VARCHAR(10) NOT NULL DEFAULT 'EN'",
+        'is_indexing': "BOOLEAN NOT NULL DEFAULT false",
+        'indexing_task_id': "VARCHAR(255)",
+        'last_indexed_file_path': "VARCHAR(512)",
+        'current_file_path': "VARCHAR(512)",
+        'indexing_status': "TEXT",
+    },
+    'analysis': {
+        'keywords': "TEXT",
+        'complexity_explanation': "TEXT",
+        'lines_of_code': "INTEGER DEFAULT 0",
+        'cyclomatic_complexity': "INTEGER DEFAULT 1",
+        'cognitive_complexity': "INTEGER DEFAULT 0",
+        'max_nesting_depth': "INTEGER DEFAULT 0",
+        'parameter_count': "INTEGER DEFAULT 0",
+        'coupling_score': "FLOAT DEFAULT 0.0",
+        'cohesion_score': "FLOAT DEFAULT 1.0",
+        'afferent_coupling': "INTEGER DEFAULT 0",
+        'efferent_coupling': "INTEGER DEFAULT 0",
+        'n_plus_one_queries': "JSONB NOT NULL DEFAULT '[]'::jsonb",
+        'space_complexity': "VARCHAR(50) DEFAULT 'O(1)'",
+        'hot_path_detected': "BOOLEAN DEFAULT false",
+        'security_issues': "JSONB NOT NULL DEFAULT '[]'::jsonb",
+        'hardcoded_secrets': "JSONB DEFAULT '[]'::jsonb",
+        'insecure_dependencies': "JSONB DEFAULT '[]'::jsonb",
+        'is_god_object': "BOOLEAN DEFAULT false",
+        'feature_envy_score': "FLOAT DEFAULT 0.0",
+        'data_clumps': "JSONB DEFAULT '[]'::jsonb",
+        'long_parameter_list': "BOOLEAN DEFAULT false",
+    },
+}
+
+def add_columns_ddl(table: str, column_names=None) -> str:
+    """Build one ALTER TABLE adding the given columns of a table (all by default)"""
+    columns = COLUMNS[table]
+    column_names = column_names or list(columns)
+    return f"ALTER TABLE {table} " + ", ".join(
+        f"ADD COLUMN IF NOT EXISTS {name} {columns[name]}" for name in column_names
+    )
+
+# Tables first, then one ALTER TABLE per table
+DDL = list(TABLES.values()) + [add_columns_ddl(table) for table in COLUMNS]
+
+def run_ddl(statements):
+    """Execute DDL statements in one transaction"""
+    db = SessionLocal()
+    try:
+        for statement in statements:
+            db.execute(text(statement))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+def ensure_columns(table: str, column_names=None):
+    """Add the given columns of a table (all by default) with a single ALTER TABLE"""
+    column_names = column_names or list(COLUMNS[table])
+    run_ddl([add_columns_ddl(table, column_names)])
+    print(f"Ensured {table} columns: {', '.join(column_names)}")
+
+@migration('bootstrap')
+def migrate():
+    """Create all tables and add all columns"""
+    run_ddl(DDL)
+    print(f"Ensured tables: {', '.join(TABLES)}")
+    for table, columns in COLUMNS.items():
+        print(f"Ensured {table} columns: {', '.join(columns)}")
+
+if __name__ == "__main__":
+    run_cli(migrate)
@@ -0,0 +1,22 @@
+"""
+Migration script to add all projects table columns in one ALTER TABLE
+(progress, tokens, UI language and indexing state fields)
+Run: docker-compose exec -T backend python -m migrations.consolidate_projects_columns
+"""
+from migrations.bootstrap import COLUMNS, ensure_columns
+from migrations._registry import migration, run_cli
+
+# column name -> definition
+PROJECTS_COLUMNS = COLUMNS['projects']
+
+def add_projects_columns(column_names=None):
+    """Add the given projects columns (all by default) with a single ALTER TABLE"""
+    ensure_columns('projects', column_names)
+
+@migration('consolidate_projects_columns')
+def migrate():
+    """Add all projects columns"""
+    add_projects_columns()
+
+if __name__ == "__main__":
+    run_cli(migrate)
@@ -0,0 +1,67 @@
+"""
+Migration script to convert analysis array columns to JSONB
+and index the ones used in filters
+Run: docker-compose exec -T backend python -m migrations.convert_analysis_json_to_jsonb
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._catalog import get_columns, forget_columns
+from migrations._util import short_ddl_txn
+from migrations._registry import migration, run_cli
+
+JSONB_COLUMNS = [
+    'solid_violations', 'design_patterns',
+    'n_plus_one_queries', 'security_issues', 'hardcoded_secrets', 'insecure_dependencies', 'data_clumps',
+]
+
+@migration('convert_analysis_json_to_jsonb')
+def migrate():
+    """Convert analysis JSON columns to JSONB and add GIN indexes"""
+    db = SessionLocal()
+    try:
+        columns = get_columns(db, 'analysis')
+        for column in JSONB_COLUMNS:
+            if columns.get(column) == 'jsonb':
+                print(f"Column {column} is already JSONB")
+                continue
+            
+            # Each conversion rewrites the table, so each gets its own transaction
+            with short_ddl_txn(db):
+                db.execute(text(f"""
+                    ALTER TABLE analysis 
+                    ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb
+                """))
+            print(f"Converted column to JSONB: {column}")
+        
+        forget_columns('analysis')
+        
+        # jsonb_path_ops is enough for @> (SOLID filter); "?" (pattern filter) needs jsonb_ops
+        with short_ddl_txn(db):
+            db.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_analysis_solid_gin 
+                ON analysis USING gin (solid_violations jsonb_path_ops)
+            """))
+        with short_ddl_txn(db):
+            db.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_analysis_patterns_gin 
+                ON analysis USING gin (design_patterns)
+            """))
+        # Replaces the plain index on security_issues with a containment (@>) index
+        with short_ddl_txn(db):
+            db.execute(text("DROP INDEX IF EXISTS idx_analysis_security"))
+            db.execute(text("""
+                CREATE INDEX idx_analysis_security 
+                ON analysis USING gin (security_issues jsonb_path_ops)
+            """))
+        print("Created indexes: idx_analysis_solid_gin, idx_analysis_patterns_gin, idx_analysis_security")
+        
+        print("Successfully converted analysis columns to JSONB")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
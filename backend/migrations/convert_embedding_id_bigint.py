@@ -0,0 +1,38 @@
+"""
+Migration script to store analysis.embedding_id as BIGINT instead of VARCHAR
+Run: docker-compose exec -T backend python -m migrations.convert_embedding_id_bigint
+"""
+from app.core.database import SessionLocal
+from sqlalchemy import text
+from migrations._catalog import get_columns, forget_columns
+from migrations._util import short_ddl_txn
+from migrations._registry import migration, run_cli
+
+@migration('convert_embedding_id_bigint')
+def migrate():
+    """Convert embedding_id column to BIGINT (Qdrant point IDs are integers)"""
+    db = SessionLocal()
+    try:
+        # Check current column type
+        if get_columns(db, 'analysis').get('embedding_id') == 'bigint':
+            print("Column embedding_id is already BIGINT")
+            return
+        
+        # Non-numeric legacy values cannot be Qdrant point IDs, so they become NULL
+        with short_ddl_txn(db):
+            db.execute(text("""
+                ALTER TABLE analysis
+                ALTER COLUMN embedding_id TYPE BIGINT
+                USING CASE WHEN embedding_id ~ '^[0-9]+$' THEN embedding_id::bigint END
+            """))
+        forget_columns('analysis')
+        print("Successfully converted embedding_id column to BIGINT")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_cli(migrate)
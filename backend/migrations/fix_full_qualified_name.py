@@ -1,14 +1,26 @@
 """
 Migration script to change full_qualified_name from VARCHAR(512) to TEXT
-Run: docker-compose exec backend python -c "from migrations.fix_full_qualified_name import migrate; migrate()"
+Run: docker-compose exec backend python -m migrations.fix_full_qualified_name
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
 
 from app.core.database import SessionLocal
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from migrations._util import short_ddl_txn
+from migrations._registry import migration, run_cli
 
+# VARCHAR(n) -> TEXT is binary coercible, so without a USING clause Postgres only
+# updates the catalog; the short lock_timeout keeps the ALTER from queueing behind
+# long transactions and blocking everyone else while it waits
+LOCK_TIMEOUT = '2s'
+STATEMENT_TIMEOUT = '30s'
+MAX_ATTEMPTS = 5
+
+# SQLSTATE lock_not_available
+LOCK_NOT_AVAILABLE = '55P03'
+
+@migration('fix_full_qualified_name')
 def migrate():
     """Change full_qualified_name column type to TEXT"""
     db = SessionLocal()
@@ -20,23 +32,33 @@ def migrate():
             WHERE table_name = 'entities' AND column_name = 'full_qualified_name'
         """))
         row = result.fetchone()
-        if row:
-            current_type = row[0]
-            max_length = row[1]
-            print(f"Current type: {current_type}({max_length})")
-            
-            if current_type == 'character varying' and max_length == 512:
-                # Change to TEXT
-                db.execute(text("""
-                    ALTER TABLE entities 
-                    ALTER COLUMN full_qualified_name TYPE TEXT
-                """))
-                db.commit()
-                print("Successfully changed full_qualified_name to TEXT")
-            else:
-                print(f"Column already has type {current_type}, no change needed")
-        else:
+        if not row:
             print("Column not found")
+            return False
+        
+        current_type, max_length = row
+        print(f"Current type: {current_type}({max_length})")
+        if current_type != 'character varying':
+            print(f"Column already has type {current_type}, no change needed")
+            return
+        
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                with short_ddl_txn(db):
+                    db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+                    db.execute(text(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'"))
+                    db.execute(text("""
+                        ALTER TABLE IF EXISTS entities 
+                        ALTER COLUMN full_qualified_name TYPE TEXT
+                    """))
+                break
+            except OperationalError as e:
+                if getattr(e.orig, 'pgcode', None) != LOCK_NOT_AVAILABLE or attempt == MAX_ATTEMPTS:
+                    raise
+                delay = 2 ** attempt
+                print(f"Lock on entities not available (attempt {attempt}/{MAX_ATTEMPTS}), retrying in {delay}s")
+                time.sleep(delay)
+        print("Successfully changed full_qualified_name to TEXT")
     except Exception as e:
         db.rollback()
         print(f"Error: {e}")
@@ -45,5 +67,4 @@ def migrate():
         db.close()
 
 if __name__ == "__main__":
-    migrate()
-
+    run_cli(migrate)
@@ -7,18 +7,18 @@ sys.path.insert(0, '/app')
 
 from app.agents.analyzer import CodeAnalyzer
 from app.core.config import settings
-from app.models.database import Entity
+from app.models.database import Entity, File
 from app.core.database import SessionLocal
 
-# Get real code from database
+# Get real code from database (only the columns used below, file path joined in)
 db = SessionLocal()
-entity = db.query(Entity).filter(Entity.code.isnot(None)).first()
-if entity:
-    test_code = entity.code
-    test_language = "php" if ".php" in entity.file.path else "python"
-    test_name = entity.name
-    test_type = entity.type
-    print(f"Using real code from: {entity.file.path}")
+row = db.query(Entity.code, Entity.name, Entity.type, File.path).join(
+    File, Entity.file_id == File.id
+).filter(Entity.code.isnot(None)).first()
+if row:
+    test_code, test_name, test_type, file_path = row
+    test_language = "php" if ".php" in file_path else "python"
+    print(f"Using real code from: {file_path}")
     print(f"Entity: {test_name} ({test_type})")
 else:
     # Fallback sample code
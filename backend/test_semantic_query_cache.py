@@ -0,0 +1,56 @@
+"""
+Test script for the semantic query cache (hit, miss, expiry)
+Run: docker-compose exec backend python test_semantic_query_cache.py
+"""
+import sys
+sys.path.insert(0, '/app')
+
+from app.services.semantic_query_cache import SemanticQueryCache
+
+PROJECT_ID = 1
+KEY = ('keywords', 'filters')
+EMBEDDING = [1.0, 0.0, 0.0]
+SIMILAR_EMBEDDING = [1.0, 0.05, 0.0]
+OTHER_EMBEDDING = [0.0, 1.0, 0.0]
+
+SemanticQueryCache.invalidate()
+SemanticQueryCache.put(PROJECT_ID, KEY, EMBEDDING, 10, ['a', 'b', 'c'])
+
+# Hit: near-identical embedding, same key and limit
+assert SemanticQueryCache.get(PROJECT_ID, KEY, SIMILAR_EMBEDDING, 10) == ['a', 'b', 'c']
+print("✅ Hit on a similar query")
+
+# Miss: different embedding, key, project or limit
+assert SemanticQueryCache.get(PROJECT_ID, KEY, OTHER_EMBEDDING, 10) is None
+assert SemanticQueryCache.get(PROJECT_ID, ('keywords', 'other filters'), EMBEDDING, 10) is None
+assert SemanticQueryCache.get(PROJECT_ID + 1, KEY, EMBEDDING, 10) is None
+assert SemanticQueryCache.get(PROJECT_ID, KEY, EMBEDDING, 2) is None
+assert SemanticQueryCache.get(PROJECT_ID, KEY, EMBEDDING, 20) is None
+print("✅ Miss on a different query, key, project or limit")
+
+# A usable entry is found even when a closer one can't be used
+SemanticQueryCache.put(PROJECT_ID, KEY, OTHER_EMBEDDING, 20, ['x'])
+SemanticQueryCache.put(PROJECT_ID, KEY, [0.0, 1.0, 0.5], 5, ['y'])
+assert SemanticQueryCache.get(PROJECT_ID, KEY, [0.0, 1.0, 0.3], 20) == ['x']
+print("✅ Unusable closer entry is skipped")
+
+# Put replaces a near-identical entry instead of appending
+entries_count = len(SemanticQueryCache._entries[PROJECT_ID])
+SemanticQueryCache.put(PROJECT_ID, KEY, SIMILAR_EMBEDDING, 10, ['d'])
+assert len(SemanticQueryCache._entries[PROJECT_ID]) == entries_count
+assert SemanticQueryCache.get(PROJECT_ID, KEY, EMBEDDING, 10) == ['d']
+print("✅ Near-identical entry is replaced")
+
+# Expiry
+ttl_seconds = SemanticQueryCache.TTL_SECONDS
+SemanticQueryCache.TTL_SECONDS = -1
+try:
+    assert SemanticQueryCache.get(PROJECT_ID, KEY, EMBEDDING, 10) is None
+finally:
+    SemanticQueryCache.TTL_SECONDS = ttl_seconds
+print("✅ Expired entry is a miss")
+
+# Invalidation
+SemanticQueryCache.invalidate(PROJECT_ID)
+assert SemanticQueryCache.get(PROJECT_ID, KEY, EMBEDDING, 10) is None
+print("✅ Invalidated project is a miss")
@@ -2,14 +2,17 @@
 MCP Resources for CodeRAG
 Provides access to code analysis data as resources
 """
+import asyncio
 import logging
 import os
-import sys
-from typing import List, Dict, Any
-import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+import orjson
+from sqlalchemy import select, func
 
 # MCP types (simplified, no external dependency)
 from app.core.database import SessionLocal
@@ -17,134 +20,185 @@ from app.models.database import Entity, Analysis, File, Project
 
 logger = logging.getLogger(__name__)
 
+# All resource URIs in one pattern: coderag://projects, coderag://{entity|analysis}/{entity_id}
+RESOURCE_URI = re.compile(r"coderag://(?:(?P<projects>projects)|(?P<kind>entity|analysis)/(?P<entity_id>\d+))")
+
+# Available resources (static)
+RESOURCES = [
+    {
+        "uri": "coderag://projects",
+        "name": "Projects",
+        "description": "List of all indexed projects",
+        "mimeType": "application/json"
+    },
+    {
+        "uri": "coderag://entity/{entity_id}",
+        "name": "Entity",
+        "description": "Get entity details by ID (use entity_id in URI)",
+        "mimeType": "application/json"
+    },
+    {
+        "uri": "coderag://analysis/{entity_id}",
+        "name": "Analysis",
+        "description": "Get analysis for entity by ID (use entity_id in URI)",
+        "mimeType": "application/json"
+    }
+]
+
+# Columns of the entity resource, in payload order
+ENTITY_COLUMNS = (
+    Entity.id, Entity.name, Entity.type, func.coalesce(File.path, "").label("file_path"),
+    Entity.start_line, Entity.end_line, Entity.full_qualified_name, Entity.code,
+)
+
+# Analysis columns of the analysis resource: top-level keys, then the nested "metrics" keys
+ANALYSIS_FIELDS = (
+    "description", "complexity", "complexity_explanation", "solid_violations", "design_patterns",
+    "ddd_role", "mvc_role", "is_testable", "testability_score", "testability_issues",
+)
+ANALYSIS_METRICS = (
+    "lines_of_code", "cyclomatic_complexity", "cognitive_complexity", "max_nesting_depth",
+    "parameter_count", "coupling_score", "cohesion_score", "security_issues", "n_plus_one_queries",
+    "is_god_object", "feature_envy_score", "long_parameter_list",
+)
+# Values left out of analysis payloads: unset columns carry nothing for the agent
+EMPTY_VALUES = (None, [], "")
+
+# MCP clients parse payloads programmatically, so they are sent compact;
+# set CODERAG_PRETTY=1 to indent them for debugging
+JSON_OPTIONS = orjson.OPT_INDENT_2 if os.environ.get("CODERAG_PRETTY") else 0
+
+
+def _dumps(payload: Any) -> str:
+    """Serialize a resource payload to a JSON string"""
+    return orjson.dumps(payload, option=JSON_OPTIONS).decode()
+
 
 class CodeRAGResources:
     """Resources for code analysis data"""
     
+    # Class-level cache: (kind, entity_id) -> (created_at, serialized JSON).
+    # Entity and analysis rows rarely change once indexed; the TTL bounds how long
+    # a re-analysis done by the Celery worker (another process) stays unseen.
+    _cache: "OrderedDict[Tuple[str, int], Tuple[float, str]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    CACHE_SIZE = 512
+    CACHE_TTL_SECONDS = 60
+    
+    @classmethod
+    def invalidate(cls, entity_id: Optional[int] = None):
+        """Drop cached resources for an entity (or for all entities)"""
+        with cls._cache_lock:
+            if entity_id is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(("entity", entity_id), None)
+                cls._cache.pop(("analysis", entity_id), None)
+    
+    async def _cached(self, kind: str, entity_id: int, loader: Callable[[int], Dict[str, Any]]) -> str:
+        """Return the serialized resource from cache, loading it in a worker thread on miss
+        
+        Error payloads (entity not found, analysis not available yet) are not cached.
+        """
+        key = (kind, entity_id)
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry and now - entry[0] < self.CACHE_TTL_SECONDS:
+                self._cache.move_to_end(key)
+                return entry[1]
+        
+        # Sync DB access must not block the event loop
+        payload = await asyncio.to_thread(loader, entity_id)
+        content = _dumps(payload)
+        if "error" not in payload:
+            with self._cache_lock:
+                self._cache[key] = (now, content)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return content
+    
     async def get_resources(self) -> List[Dict[str, Any]]:
         """Get list of available resources"""
-        return [
-            {
-                "uri": "coderag://projects",
-                "name": "Projects",
-                "description": "List of all indexed projects",
-                "mimeType": "application/json"
-            },
-            {
-                "uri": "coderag://entity/{entity_id}",
-                "name": "Entity",
-                "description": "Get entity details by ID (use entity_id in URI)",
-                "mimeType": "application/json"
-            },
-            {
-                "uri": "coderag://analysis/{entity_id}",
-                "name": "Analysis",
-                "description": "Get analysis for entity by ID (use entity_id in URI)",
-                "mimeType": "application/json"
-            }
-        ]
+        return RESOURCES
     
     async def read_resource(self, uri: str) -> str:
         """Read a resource by URI"""
-        if uri == "coderag://projects":
+        match = RESOURCE_URI.fullmatch(uri or "")
+        if not match:
+            raise ValueError(f"Unknown resource URI: {uri}")
+        if match.group("projects"):
             return await self._get_projects()
-        elif uri.startswith("coderag://entity/"):
-            entity_id = int(uri.split("/")[-1])
+        
+        entity_id = int(match.group("entity_id"))
+        if match.group("kind") == "entity":
             return await self._get_entity(entity_id)
-        elif uri.startswith("coderag://analysis/"):
-            entity_id = int(uri.split("/")[-1])
-            return await self._get_analysis(entity_id)
-        else:
-            raise ValueError(f"Unknown resource URI: {uri}")
+        return await self._get_analysis(entity_id)
     
     async def _get_projects(self) -> str:
         """Get all projects"""
+        # Sync DB access must not block the event loop
+        return await asyncio.to_thread(self._load_projects)
+    
+    def _load_projects(self) -> str:
         db = SessionLocal()
         try:
-            projects = db.query(Project).all()
-            result = []
-            for project in projects:
-                result.append({
-                    "id": project.id,
-                    "name": project.name,
-                    "path": project.path,
-                    "language": project.language,
-                    "total_files": project.total_files,
-                    "indexed_files": project.indexed_files,
-                    "total_entities": project.total_entities,
-                    "is_indexing": project.is_indexing
-                })
-            return json.dumps({"projects": result}, indent=2)
+            # Plain rows of the listed columns, no ORM instances
+            rows = db.execute(select(
+                Project.id, Project.name, Project.path, Project.language,
+                Project.total_files, Project.indexed_files, Project.total_entities, Project.is_indexing
+            )).mappings()
+            return _dumps({"projects": [dict(row) for row in rows]})
         finally:
             db.close()
     
     async def _get_entity(self, entity_id: int) -> str:
         """Get entity by ID"""
+        return await self._cached("entity", entity_id, self._load_entity)
+    
+    def _load_entity(self, entity_id: int) -> Dict[str, Any]:
         db = SessionLocal()
         try:
-            entity = db.query(Entity).filter(Entity.id == entity_id).first()
-            if not entity:
-                return json.dumps({"error": "Entity not found"}, indent=2)
-            
-            file = db.query(File).filter(File.id == entity.file_id).first()
+            # Plain row with the file path joined in, no ORM instances
+            row = db.execute(
+                select(*ENTITY_COLUMNS)
+                .outerjoin(File, File.id == Entity.file_id)
+                .where(Entity.id == entity_id)
+            ).mappings().first()
+            if not row:
+                return {"error": "Entity not found"}
             
-            result = {
-                "id": entity.id,
-                "name": entity.name,
-                "type": entity.type,
-                "file_path": file.path if file else "",
-                "start_line": entity.start_line,
-                "end_line": entity.end_line,
-                "full_qualified_name": entity.full_qualified_name,
-                "code": entity.code
-            }
-            
-            return json.dumps(result, indent=2)
+            return dict(row)
         finally:
             db.close()
     
     async def _get_analysis(self, entity_id: int) -> str:
         """Get analysis for entity"""
+        return await self._cached("analysis", entity_id, self._load_analysis)
+    
+    def _load_analysis(self, entity_id: int) -> Dict[str, Any]:
         db = SessionLocal()
         try:
-            entity = db.query(Entity).filter(Entity.id == entity_id).first()
-            if not entity:
-                return json.dumps({"error": "Entity not found"}, indent=2)
-            
-            analysis = db.query(Analysis).filter(Analysis.entity_id == entity_id).first()
+            # Entity existence and the analysis columns in one plain-row query
+            row = db.execute(
+                select(
+                    Entity.id, Analysis.id.label("analysis_id"),
+                    *(getattr(Analysis, name) for name in ANALYSIS_FIELDS + ANALYSIS_METRICS)
+                )
+                .outerjoin(Analysis, Analysis.entity_id == Entity.id)
+                .where(Entity.id == entity_id)
+            ).mappings().first()
+            if not row:
+                return {"error": "Entity not found"}
+            if row["analysis_id"] is None:
+                return {"error": "Analysis not available"}
             
-            if not analysis:
-                return json.dumps({"error": "Analysis not available"}, indent=2)
-            
-            result = {
+            return {
                 "entity_id": entity_id,
-                "description": analysis.description,
-                "complexity": analysis.complexity,
-                "complexity_explanation": analysis.complexity_explanation,
-                "solid_violations": analysis.solid_violations or [],
-                "design_patterns": analysis.design_patterns or [],
-                "ddd_role": analysis.ddd_role,
-                "mvc_role": analysis.mvc_role,
-                "is_testable": analysis.is_testable,
-                "testability_score": analysis.testability_score,
-                "testability_issues": analysis.testability_issues or [],
-                "metrics": {
-                    "lines_of_code": analysis.lines_of_code,
-                    "cyclomatic_complexity": analysis.cyclomatic_complexity,
-                    "cognitive_complexity": analysis.cognitive_complexity,
-                    "max_nesting_depth": analysis.max_nesting_depth,
-                    "parameter_count": analysis.parameter_count,
-                    "coupling_score": analysis.coupling_score,
-                    "cohesion_score": analysis.cohesion_score,
-                    "security_issues": analysis.security_issues or [],
-                    "n_plus_one_queries": analysis.n_plus_one_queries or [],
-                    "is_god_object": analysis.is_god_object,
-                    "feature_envy_score": analysis.feature_envy_score,
-                    "long_parameter_list": analysis.long_parameter_list
-                }
+                **{name: row[name] for name in ANALYSIS_FIELDS if row[name] not in EMPTY_VALUES},
+                "metrics": {name: row[name] for name in ANALYSIS_METRICS if row[name] not in EMPTY_VALUES},
             }
-            
-            return json.dumps(result, indent=2)
         finally:
             db.close()
 
@@ -3,17 +3,24 @@
 MCP Server for CodeRAG
 Provides tools and resources for code analysis and search via Model Context Protocol
 
-This server implements the MCP protocol using stdio transport (JSON-RPC over stdin/stdout)
+This server implements the MCP protocol using stdio transport (JSON-RPC over stdin/stdout);
+local clients can opt into a UNIX socket with length-prefixed messages (--unix PATH)
+
+Run: PYTHONPATH=backend:. python -m mcp_server.server
+(in the containers both are already importable: goose sets PYTHONPATH, backend runs from /app)
 """
+import argparse
 import asyncio
 import json
 import logging
+import stat
+import struct
 import sys
-from typing import Any, Dict, List, Optional
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
 import os
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+import orjson
 
 from mcp_server.tools import CodeRAGTools
 from mcp_server.resources import CodeRAGResources
@@ -25,6 +32,92 @@ logger = logging.getLogger(__name__)
 tools = CodeRAGTools()
 resources = CodeRAGResources()
 
+# Response to an unparseable line, encoded once (the request id is unknown)
+PARSE_ERROR_RESPONSE = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": None,
+    "error": {
+        "code": -32700,
+        "message": "Parse error"
+    }
+})
+
+# Static list result for a client whose cached copy is still current
+NOT_MODIFIED_RESULT = orjson.Fragment(orjson.dumps({"notModified": True}))
+
+# Maximum size of one JSON-RPC request (asyncio's default line limit is 64 KiB)
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+# UNIX socket framing: little-endian uint32 body length before each JSON body
+FRAME_HEADER = struct.Struct("<I")
+
+
+def _is_pipe_or_socket(fd: int) -> bool:
+    mode = os.fstat(fd).st_mode
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+def _same_file(fd: int, other_fd: int) -> bool:
+    first, second = os.fstat(fd), os.fstat(other_fd)
+    return (first.st_dev, first.st_ino) == (second.st_dev, second.st_ino)
+
+
+class _ExecutorStdinReader:
+    """StreamReader stand-in for a stdin that is not a pipe (e.g. redirected from a file)
+    
+    Each readline() runs in the default thread pool.
+    """
+    
+    async def readline(self) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(None, sys.stdin.buffer.readline)
+
+
+class _BlockingStdoutWriter:
+    """StreamWriter stand-in for a stdout that is not a pipe (a file or a tty)
+    
+    Bytes are written straight to the file descriptor; drain() has nothing to wait for.
+    """
+    
+    def __init__(self, fd: int):
+        self._fd = fd
+    
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+    
+    def writelines(self, chunks):
+        self.write(b"".join(chunks))
+    
+    async def drain(self):
+        pass
+
+
+async def _open_stdio():
+    """Connect stdin/stdout to asyncio streams
+    
+    Pipes and sockets get non-blocking transports. Other files fall back to a
+    thread-pool reader and blocking writes: a regular file can't be registered
+    with the event loop, and the transports set O_NONBLOCK on the shared file
+    description, which would make logging to the same tty (or pipe) as stderr
+    fail with BlockingIOError.
+    """
+    loop = asyncio.get_running_loop()
+    stdin_fd, stdout_fd = sys.stdin.fileno(), sys.stdout.fileno()
+    
+    if _is_pipe_or_socket(stdin_fd):
+        reader = asyncio.StreamReader(limit=MAX_MESSAGE_SIZE)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    else:
+        reader = _ExecutorStdinReader()
+    
+    if _is_pipe_or_socket(stdout_fd) and not _same_file(stdout_fd, sys.stderr.fileno()):
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+        writer = asyncio.StreamWriter(transport, protocol, None, loop)
+    else:
+        writer = _BlockingStdoutWriter(stdout_fd)
+    return reader, writer
+
 
 class MCPServer:
     """Simple MCP server implementation using JSON-RPC over stdio"""
@@ -33,6 +126,16 @@ class MCPServer:
         self.request_id = 0
         self.tools = tools
         self.resources = resources
+        # JSON-RPC method -> handler returning the "result" object
+        self._methods = {
+            "initialize": self._initialize,
+            "tools/list": self._list_tools,
+            "tools/call": self._call_tool,
+            "resources/list": self._list_resources,
+            "resources/read": self._read_resource,
+        }
+        # Static list results, serialized once: result key -> (JSON fragment, version)
+        self._static_results: Dict[str, Tuple[orjson.Fragment, int]] = {}
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle a JSON-RPC request"""
@@ -40,82 +143,23 @@ class MCPServer:
         params = request.get("params", {})
         request_id = request.get("id")
         
-        try:
-            if method == "initialize":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {},
-                            "resources": {}
-                        },
-                        "serverInfo": {
-                            "name": "coderag-mcp",
-                            "version": "1.0.0"
-                        }
-                    }
-                }
-            elif method == "tools/list":
-                tools_list = await self.tools.get_tools()
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "tools": tools_list
-                    }
-                }
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                result_text = await self.tools.call_tool(tool_name, arguments)
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": result_text
-                            }
-                        ]
-                    }
-                }
-            elif method == "resources/list":
-                resources_list = await self.resources.get_resources()
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "resources": resources_list
-                    }
-                }
-            elif method == "resources/read":
-                uri = params.get("uri")
-                content = await self.resources.read_resource(uri)
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "contents": [
-                            {
-                                "uri": uri,
-                                "mimeType": "application/json",
-                                "text": content
-                            }
-                        ]
-                    }
-                }
-            else:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {method}"
-                    }
+        handler = self._methods.get(method)
+        if handler is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32601,
+                    "message": f"Method not found: {method}"
                 }
+            }
+        
+        try:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "result": await handler(params)
+            }
         except Exception as e:
             logger.error(f"Error handling request {method}: {e}", exc_info=True)
             return {
@@ -127,16 +171,108 @@ class MCPServer:
                 }
             }
     
+    async def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle the MCP initialize handshake"""
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {},
+                "resources": {}
+            },
+            "serverInfo": {
+                "name": "coderag-mcp",
+                "version": "1.0.0"
+            }
+        }
+    
+    async def _list_tools(self, params: Dict[str, Any]) -> orjson.Fragment:
+        """List available tools"""
+        return await self._static_result("tools", self.tools.get_tools, params)
+    
+    async def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool and wrap its text result"""
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        result_text = await self.tools.call_tool(tool_name, arguments)
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": result_text
+                }
+            ]
+        }
+    
+    async def _list_resources(self, params: Dict[str, Any]) -> orjson.Fragment:
+        """List available resources"""
+        return await self._static_result("resources", self.resources.get_resources, params)
+    
+    async def _static_result(self, key: str, loader, params: Dict[str, Any]) -> orjson.Fragment:
+        """Build a static {key: list, version: n} result on first use and reuse its encoded bytes
+        
+        The fragment is embedded as-is when the response envelope is serialized.
+        The version is a checksum of the list, so it stays the same across restarts;
+        a client sending params {"since": version} gets {"notModified": true} instead.
+        """
+        cached = self._static_results.get(key)
+        if cached is None:
+            items = await loader()
+            version = zlib.crc32(orjson.dumps(items, option=orjson.OPT_SORT_KEYS))
+            cached = (orjson.Fragment(orjson.dumps({key: items, "version": version})), version)
+            self._static_results[key] = cached
+        fragment, version = cached
+        if (params or {}).get("since") == version:
+            return NOT_MODIFIED_RESULT
+        return fragment
+    
+    async def _read_resource(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a resource by URI"""
+        uri = params.get("uri")
+        content = await self.resources.read_resource(uri)
+        return {
+            "contents": [
+                {
+                    "uri": uri,
+                    "mimeType": "application/json",
+                    "text": content
+                }
+            ]
+        }
+    
+    def _dispatch(self, request: Dict[str, Any], write_message, pending: set):
+        """Handle a request in its own task and send the response with write_message
+        
+        Requests are answered as they complete (clients correlate by id); tasks
+        are kept in `pending` until done so they aren't garbage collected.
+        """
+        async def process():
+            try:
+                response = await self.handle_request(request)
+                await write_message(response)
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}", exc_info=True)
+        
+        task = asyncio.create_task(process())
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    
     async def run(self):
         """Run the server, reading from stdin and writing to stdout"""
         logger.info("Starting CodeRAG MCP Server...")
+        reader, writer = await _open_stdio()
+        
+        async def write_message(message: Dict[str, Any]):
+            # One bytes buffer per message (newline included), so concurrent responses
+            # never interleave; drain() only waits when the client is not keeping up
+            writer.write(orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE))
+            await writer.drain()
+        
+        pending = set()
         
         while True:
             try:
                 # Read line from stdin (JSON-RPC requests are newline-delimited)
-                line = await asyncio.get_event_loop().run_in_executor(
-                    None, sys.stdin.readline
-                )
+                line = await reader.readline()
                 
                 if not line:
                     break
@@ -145,36 +281,80 @@ class MCPServer:
                 if not line:
                     continue
                 
-                # Parse JSON-RPC request
-                request = json.loads(line)
-                
-                # Handle request
-                response = await self.handle_request(request)
-                
-                # Write response to stdout
-                print(json.dumps(response), flush=True)
+                # Parse JSON-RPC request and handle it without blocking the next read
+                self._dispatch(orjson.loads(line), write_message, pending)
                 
+            # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
             except json.JSONDecodeError as e:
                 logger.error(f"Invalid JSON: {e}")
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": "Parse error"
-                    }
-                }
-                print(json.dumps(error_response), flush=True)
+                writer.writelines([PARSE_ERROR_RESPONSE, b"\n"])
+                await writer.drain()
             except Exception as e:
                 logger.error(f"Unexpected error: {e}", exc_info=True)
+        
+        # Answer requests still in flight when stdin closes
+        if pending:
+            await asyncio.gather(*pending)
+    
+    async def run_unix(self, path: str):
+        """Run the server on a UNIX socket, one client connection per task"""
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        logger.info(f"Starting CodeRAG MCP Server on UNIX socket {path}...")
+        async with server:
+            await server.serve_forever()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one UNIX socket client (length-prefixed JSON-RPC messages)"""
+        async def write_message(message: Dict[str, Any]):
+            body = orjson.dumps(message)
+            writer.writelines([FRAME_HEADER.pack(len(body)), body])
+            await writer.drain()
+        
+        pending = set()
+        try:
+            while True:
+                try:
+                    (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                    if length > MAX_MESSAGE_SIZE:
+                        logger.error(f"Message of {length} bytes exceeds limit, closing connection")
+                        break
+                    body = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    # Client closed the connection
+                    break
+                
+                try:
+                    request = orjson.loads(body)
+                except orjson.JSONDecodeError as e:
+                    logger.error(f"Invalid JSON: {e}")
+                    writer.writelines([FRAME_HEADER.pack(len(PARSE_ERROR_RESPONSE)), PARSE_ERROR_RESPONSE])
+                    await writer.drain()
+                    continue
+                
+                self._dispatch(request, write_message, pending)
+            
+            if pending:
+                await asyncio.gather(*pending)
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}", exc_info=True)
+        finally:
+            writer.close()
 
 
 async def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="CodeRAG MCP Server")
+    parser.add_argument("--unix", metavar="PATH", help="Serve length-prefixed JSON-RPC on a UNIX socket instead of stdio")
+    args = parser.parse_args()
+    
     server = MCPServer()
-    await server.run()
+    if args.unix:
+        await server.run_unix(args.unix)
+    else:
+        await server.run()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-
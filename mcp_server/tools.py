@@ -2,218 +2,485 @@
 MCP Tools for CodeRAG
 Provides code search, analysis, and refactoring tools
 """
+import asyncio
 import logging
-import os
-import sys
-from typing import Any, Dict, List, Optional
-import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+import orjson
 
 from app.core.database import SessionLocal
 from app.services.search_service import SearchService
-from app.models.database import Entity, Analysis, File, Project
+from app.models.database import Entity, Analysis, Dependency, File, Project
 from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, joinedload, load_only, selectinload
 
 logger = logging.getLogger(__name__)
 
+# Tool results are read by the agent's LLM, so they stay indented; datetimes
+# are stored as naive UTC and are serialized with an explicit +00:00 offset
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC
 
-class CodeRAGTools:
-    """Tools for code analysis and search"""
-    
-    def __init__(self):
-        self.search_service = SearchService()
-    
-    async def get_tools(self) -> List[Dict[str, Any]]:
-        """Get list of available tools"""
-        return [
-            {
-                "name": "search_code",
-                "description": "Search code using natural language query. Finds methods, classes, functions that match the query.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Natural language search query (e.g., 'find methods for sending messages', 'classes with O(n^2) complexity')"
-                        },
-                        "project_id": {
-                            "type": "integer",
-                            "description": "Project ID to search in (optional, searches all projects if not specified)"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results (default: 10, max: 50)",
-                            "default": 10,
-                            "minimum": 1,
-                            "maximum": 50
-                        }
-                    },
-                    "required": ["query"]
-                }
-            },
-            {
-                "name": "analyze_method",
-                "description": "Get detailed analysis of a specific method, class, or function by entity ID or file path and name.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "entity_id": {
-                            "type": "integer",
-                            "description": "Entity ID (if you know it)"
-                        },
-                        "file_path": {
-                            "type": "string",
-                            "description": "File path (relative to project root)"
-                        },
-                        "entity_name": {
-                            "type": "string",
-                            "description": "Name of the method/class/function"
-                        },
-                        "project_id": {
-                            "type": "integer",
-                            "description": "Project ID (required if using file_path)"
-                        }
-                    },
-                    "required": []
+
+def _dumps(payload: Any) -> str:
+    """Serialize a tool result to a JSON string"""
+    return orjson.dumps(payload, option=JSON_OPTIONS).decode()
+
+
+# search_code description for entities that have not been analyzed yet
+NO_ANALYSIS_DESCRIPTION = "No analysis available"
+
+# Available tools (static)
+TOOLS = [
+    {
+        "name": "search_code",
+        "description": "Search code using natural language query. Finds methods, classes, functions that match the query.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Natural language search query (e.g., 'find methods for sending messages', 'classes with O(n^2) complexity')"
+                },
+                "project_id": {
+                    "type": "integer",
+                    "description": "Project ID to search in (optional, searches all projects if not specified)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 10, max: 50)",
+                    "default": 10,
+                    "minimum": 1,
+                    "maximum": 50
                 }
             },
-            {
-                "name": "get_refactoring_suggestions",
-                "description": "Get refactoring suggestions for a method or class, including similar code patterns and SOLID violations.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "entity_id": {
-                            "type": "integer",
-                            "description": "Entity ID to analyze"
-                        },
-                        "similarity_threshold": {
-                            "type": "number",
-                            "description": "Minimum similarity score for similar code (0.0-1.0, default: 0.7)",
-                            "default": 0.7,
-                            "minimum": 0.0,
-                            "maximum": 1.0
-                        }
-                    },
-                    "required": ["entity_id"]
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "analyze_method",
+        "description": "Get detailed analysis of a specific method, class, or function by entity ID or file path and name.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "entity_id": {
+                    "type": "integer",
+                    "description": "Entity ID (if you know it)"
+                },
+                "file_path": {
+                    "type": "string",
+                    "description": "File path (relative to project root)"
+                },
+                "entity_name": {
+                    "type": "string",
+                    "description": "Name of the method/class/function"
+                },
+                "project_id": {
+                    "type": "integer",
+                    "description": "Project ID (required if using file_path)"
                 }
             },
-            {
-                "name": "get_similar_code",
-                "description": "Find similar code patterns for refactoring opportunities.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "entity_id": {
-                            "type": "integer",
-                            "description": "Entity ID to find similar code for"
-                        },
-                        "project_id": {
-                            "type": "integer",
-                            "description": "Project ID to search in (optional, searches all projects if not specified)"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of similar code blocks (default: 5, max: 20)",
-                            "default": 5,
-                            "minimum": 1,
-                            "maximum": 20
-                        }
-                    },
-                    "required": ["entity_id"]
+            "required": []
+        }
+    },
+    {
+        "name": "get_refactoring_suggestions",
+        "description": "Get refactoring suggestions for a method or class, including similar code patterns and SOLID violations.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "entity_id": {
+                    "type": "integer",
+                    "description": "Entity ID to analyze"
+                },
+                "similarity_threshold": {
+                    "type": "number",
+                    "description": "Minimum similarity score for similar code (0.0-1.0, default: 0.7)",
+                    "default": 0.7,
+                    "minimum": 0.0,
+                    "maximum": 1.0
                 }
             },
-            {
-                "name": "get_entity_details",
-                "description": "Get full details about an entity including code, analysis, dependencies, and metrics.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "entity_id": {
-                            "type": "integer",
-                            "description": "Entity ID"
-                        }
-                    },
-                    "required": ["entity_id"]
+            "required": ["entity_id"]
+        }
+    },
+    {
+        "name": "get_similar_code",
+        "description": "Find similar code patterns for refactoring opportunities.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "entity_id": {
+                    "type": "integer",
+                    "description": "Entity ID to find similar code for"
+                },
+                "project_id": {
+                    "type": "integer",
+                    "description": "Project ID to search in (optional, searches all projects if not specified)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of similar code blocks (default: 5, max: 20)",
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": 20
                 }
             },
-            {
-                "name": "list_projects",
-                "description": "List all indexed projects with their status and statistics. Use this to see what projects are available and their details (ID, name, path, language, file counts, entity counts).",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {}
+            "required": ["entity_id"]
+        }
+    },
+    {
+        "name": "get_entity_details",
+        "description": "Get full details about an entity including code, analysis, dependencies, and metrics.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "entity_id": {
+                    "type": "integer",
+                    "description": "Entity ID"
                 }
             },
-            {
-                "name": "get_project_info",
-                "description": "Get detailed information about a specific project by ID, including path, language, indexing status, and statistics.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "project_id": {
-                            "type": "integer",
-                            "description": "Project ID"
-                        }
-                    },
-                    "required": ["project_id"]
+            "required": ["entity_id"]
+        }
+    },
+    {
+        "name": "list_projects",
+        "description": "List all indexed projects with their status and statistics. Use this to see what projects are available and their details (ID, name, path, language, file counts, entity counts). Results are ordered by ID; if next_cursor is set, pass it as after_id to get the next page.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "after_id": {
+                    "type": "integer",
+                    "description": "Return projects with ID greater than this (next_cursor of the previous page)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of projects (default: 100, max: 500)",
+                    "default": 100,
+                    "minimum": 1,
+                    "maximum": 500
                 }
-            },
-            {
-                "name": "get_capabilities",
-                "description": "Get information about available capabilities, tools, and what questions can be answered. Use this when user asks about what you can do, your capabilities, available features, or help.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {}
+            }
+        }
+    },
+    {
+        "name": "get_project_info",
+        "description": "Get detailed information about a specific project by ID, including path, language, indexing status, and statistics.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "integer",
+                    "description": "Project ID"
                 }
             },
-            {
-                "name": "get_entity_schema",
-                "description": "Get detailed schema of Entity and Analysis data structures. This describes all available fields, metrics, and how to search by them. Use this to understand what data is available and how to formulate search queries.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {}
-                }
-            }
+            "required": ["project_id"]
+        }
+    },
+    {
+        "name": "get_capabilities",
+        "description": "Get information about available capabilities, tools, and what questions can be answered. Use this when user asks about what you can do, your capabilities, available features, or help.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "get_entity_schema",
+        "description": "Get detailed schema of Entity and Analysis data structures. This describes all available fields, metrics, and how to search by them. Use this to understand what data is available and how to formulate search queries.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    }
+]
+
+# get_capabilities and get_entity_schema answers are constant, so they are serialized once
+CAPABILITIES = {
+    "system": "Goose - AI-ассистент для анализа кода в системе CodeRAG",
+    "description": "Я помогаю отвечать на вопросы о кодовой базе, используя различные инструменты для поиска и анализа кода.",
+    "available_tools": [
+        {
+            "name": "search_code",
+            "description": "Поиск кода по естественному языку",
+            "capabilities": [
+                "Находит методы, классы, функции, константы, enum-ы",
+                "Поддерживает семантический поиск по описаниям и коду",
+                "Ищет по ключевым словам и синонимам"
+            ],
+            "example_questions": [
+                "какой таймаут отправки письма?",
+                "какие статусы есть для email?",
+                "найди методы для отправки сообщений",
+                "классы с высокой сложностью"
+            ]
+        },
+        {
+            "name": "get_entity_details",
+            "description": "Получение детальной информации о сущности",
+            "capabilities": [
+                "Анализ конкретного класса, метода, функции или константы",
+                "Получение метрик сложности, описания, зависимостей",
+                "Просмотр полного кода сущности"
+            ],
+            "example_questions": [
+                "расскажи про класс EmailService",
+                "что делает метод sendEmail?",
+                "детали константы EMAIL_SEND_TIMEOUT"
+            ]
+        },
+        {
+            "name": "analyze_method",
+            "description": "Детальный анализ метода/класса/функции",
+            "capabilities": [
+                "Анализ сложности (O-нотация, цикломатическая, когнитивная)",
+                "Выявление нарушений SOLID принципов",
+                "Определение паттернов проектирования",
+                "Оценка тестируемости и проблем безопасности"
+            ],
+            "example_questions": [
+                "проанализируй метод sendWelcomeEmail",
+                "какая сложность у этого класса?",
+                "есть ли нарушения SOLID?"
+            ]
+        },
+        {
+            "name": "get_refactoring_suggestions",
+            "description": "Предложения по рефакторингу",
+            "capabilities": [
+                "Поиск похожих паттернов кода",
+                "Выявление нарушений SOLID принципов",
+                "Рекомендации по улучшению кода"
+            ],
+            "example_questions": [
+                "как можно улучшить этот метод?",
+                "есть ли похожий код для рефакторинга?"
+            ]
+        },
+        {
+            "name": "get_similar_code",
+            "description": "Поиск похожего кода",
+            "capabilities": [
+                "Находит похожие методы и классы по отпечатку кода",
+                "Помогает найти дублирование",
+                "Выявляет возможности для рефакторинга"
+            ],
+            "example_questions": [
+                "найди похожий код",
+                "есть ли дублирование?"
+            ]
+        },
+        {
+            "name": "list_projects",
+            "description": "Список проиндексированных проектов",
+            "capabilities": [
+                "Показывает все проекты с их статусом",
+                "Статистика: количество файлов, сущностей",
+                "Информация о языке и пути проекта"
+            ],
+            "example_questions": [
+                "какие проекты есть?",
+                "покажи список проектов"
+            ]
+        },
+        {
+            "name": "get_project_info",
+            "description": "Информация о конкретном проекте",
+            "capabilities": [
+                "Детали проекта: путь, язык, статус индексации",
+                "Статистика: количество файлов и сущностей",
+                "Информация о последней индексации"
+            ],
+            "example_questions": [
+                "информация о проекте с ID 3",
+                "статус индексации проекта"
+            ]
+        }
+    ],
+    "what_i_can_do": [
+        "Отвечать на вопросы о функциональности кода",
+        "Находить конкретные константы, методы, классы",
+        "Объяснять, как работает код",
+        "Предлагать улучшения и рефакторинг",
+        "Анализировать сложность и качество кода",
+        "Искать похожие паттерны в кодовой базе",
+        "Определять нарушения SOLID принципов",
+        "Оценивать тестируемость кода",
+        "Выявлять проблемы безопасности"
+    ]
+}
+CAPABILITIES_JSON = _dumps(CAPABILITIES)
+
+ENTITY_SCHEMA = {
+    "description": "Структура данных о сущностях кода (Entity) и их анализе (Analysis). Эта информация помогает понять, какие данные доступны и как по ним можно искать.",
+    "entity": {
+        "description": "Базовая информация о сущности кода (класс, метод, функция, константа, enum)",
+        "fields": {
+            "id": {"type": "integer", "description": "Уникальный идентификатор сущности"},
+            "type": {"type": "string", "description": "Тип сущности: 'class', 'method', 'function', 'constant', 'enum'", "searchable": True, "example_queries": ["найди все классы", "покажи методы", "найди константы"]},
+            "name": {"type": "string", "description": "Имя сущности", "searchable": True, "example_queries": ["найди EmailService", "метод sendEmail"]},
+            "full_qualified_name": {"type": "string", "description": "Полное квалифицированное имя (например, 'ClassName.method_name')", "searchable": True},
+            "file_path": {"type": "string", "description": "Путь к файлу относительно корня проекта", "searchable": True},
+            "start_line": {"type": "integer", "description": "Номер строки начала"},
+            "end_line": {"type": "integer", "description": "Номер строки конца"},
+            "visibility": {"type": "string", "description": "Видимость: 'public', 'private', 'protected'", "searchable": True},
+            "code": {"type": "string", "description": "Полный код сущности", "searchable": True}
+        }
+    },
+    "analysis": {
+        "description": "Детальный анализ сущности с метриками, сложностью, архитектурными ролями и т.д.",
+        "fields": {
+            "description": {"type": "string", "description": "Описание функциональности сущности (2-3 предложения)", "searchable": True, "example_queries": ["найди код для отправки email", "что делает метод отправки"]},
+            "complexity": {"type": "string", "description": "Временная сложность в O-нотации: 'O(1)', 'O(log n)', 'O(n)', 'O(n log n)', 'O(n^2)', 'O(n^3)', 'O(2^n)', 'O(n!)'", "searchable": True, "example_queries": ["найди методы со сложностью O(n^2)", "классы с O(n!) сложностью", "методы со сложностью NP"]},
+            "complexity_numeric": {"type": "float", "description": "Числовое значение сложности для сортировки: 1=O(1), 2=O(log n), 3=O(n), 4=O(n log n), 5=O(n^2), 6=O(n^3), 7=O(2^n), 8=O(n!)", "searchable": True, "range_queries": True},
+            "complexity_explanation": {"type": "string", "description": "Объяснение почему такая сложность"},
+            "ddd_role": {"type": "string", "description": "Роль в Domain-Driven Design: 'Entity', 'ValueObject', 'Aggregate', 'Service', 'Repository', 'Factory' и т.д.", "searchable": True, "example_queries": ["найди все Repository", "покажи Entity в DDD", "какие Service есть?"]},
+            "mvc_role": {"type": "string", "description": "Роль в MVC архитектуре: 'Controller', 'Model', 'View', 'Service', 'Repository' и т.д.", "searchable": True, "example_queries": ["найди все Controller", "покажи Model классы", "какие Service есть?"]},
+            "design_patterns": {"type": "array", "description": "Список паттернов проектирования (например, ['Factory', 'Strategy', 'Observer'])", "searchable": True, "example_queries": ["найди код с паттерном Factory", "где используется Strategy?"]},
+            "solid_violations": {"type": "array", "description": "Список нарушений SOLID принципов", "searchable": True, "example_queries": ["найди нарушения Single Responsibility", "где нарушается Liskov Substitution?"]},
+            "is_testable": {"type": "boolean", "description": "Можно ли тестировать", "searchable": True},
+            "testability_score": {"type": "float", "description": "Оценка тестируемости (0.0-1.0)", "searchable": True, "range_queries": True},
+            "testability_issues": {"type": "array", "description": "Проблемы с тестируемостью"},
+            "lines_of_code": {"type": "integer", "description": "Количество строк кода", "searchable": True, "range_queries": True},
+            "cyclomatic_complexity": {"type": "integer", "description": "Цикломатическая сложность", "searchable": True, "range_queries": True, "example_queries": ["найди методы с высокой цикломатической сложностью"]},
+            "cognitive_complexity": {"type": "integer", "description": "Когнитивная сложность", "searchable": True, "range_queries": True},
+            "max_nesting_depth": {"type": "integer", "description": "Максимальная глубина вложенности", "searchable": True, "range_queries": True},
+            "parameter_count": {"type": "integer", "description": "Количество параметров", "searchable": True, "range_queries": True},
+            "coupling_score": {"type": "float", "description": "Оценка связанности (0.0-1.0)", "searchable": True, "range_queries": True},
+            "cohesion_score": {"type": "float", "description": "Оценка связности (0.0-1.0)", "searchable": True, "range_queries": True},
+            "afferent_coupling": {"type": "integer", "description": "Входящие зависимости (сколько классов зависят от этого)", "searchable": True, "range_queries": True},
+            "efferent_coupling": {"type": "integer", "description": "Исходящие зависимости (от скольких классов зависит)", "searchable": True, "range_queries": True},
+            "space_complexity": {"type": "string", "description": "Пространственная сложность (например, 'O(1)', 'O(n)')", "searchable": True},
+            "n_plus_one_queries": {"type": "array", "description": "Список N+1 запросов к БД", "searchable": True, "example_queries": ["найди код с N+1 проблемой"]},
+            "hot_path_detected": {"type": "boolean", "description": "Обнаружен ли hot path (часто выполняемый код)", "searchable": True},
+            "security_issues": {"type": "array", "description": "Проблемы безопасности", "searchable": True, "example_queries": ["найди проблемы безопасности", "где есть уязвимости?"]},
+            "hardcoded_secrets": {"type": "array", "description": "Хардкоженные секреты", "searchable": True},
+            "insecure_dependencies": {"type": "array", "description": "Небезопасные зависимости", "searchable": True},
+            "is_god_object": {"type": "boolean", "description": "Является ли God Object (слишком много ответственности)", "searchable": True, "example_queries": ["найди God Objects"]},
+            "feature_envy_score": {"type": "float", "description": "Оценка Feature Envy (0.0-1.0)", "searchable": True, "range_queries": True},
+            "data_clumps": {"type": "array", "description": "Группы данных, которые часто используются вместе", "searchable": True},
+            "long_parameter_list": {"type": "boolean", "description": "Длинный список параметров", "searchable": True},
+            "keywords": {"type": "string", "description": "Ключевые слова для семантического поиска (синонимы, связанные термины)", "searchable": True}
+        }
+    },
+    "search_guidelines": {
+        "description": "Как правильно формулировать поисковые запросы",
+        "tips": [
+            "Для поиска по сложности используйте: 'найди методы со сложностью O(n^2)', 'классы с O(n!) сложностью', 'методы со сложностью NP'",
+            "Для поиска по DDD ролям: 'найди все Repository', 'покажи Entity в DDD', 'какие Service есть?'",
+            "Для поиска по MVC ролям: 'найди все Controller', 'покажи Model классы', 'какие Service есть?'",
+            "Для поиска по паттернам: 'найди код с паттерном Factory', 'где используется Strategy?'",
+            "Для поиска по метрикам: 'найди методы с высокой цикломатической сложностью', 'классы с низкой тестируемостью'",
+            "Для поиска по проблемам: 'найди нарушения SOLID', 'найди God Objects', 'найди код с N+1 проблемой'",
+            "Система автоматически распознает эти паттерны в запросах и применяет соответствующие фильтры"
         ]
+    }
+}
+ENTITY_SCHEMA_JSON = _dumps(ENTITY_SCHEMA)
+
+# Tools answered without a DB session: name -> serialized result
+STATIC_TOOL_RESULTS = {
+    "get_capabilities": CAPABILITIES_JSON,
+    "get_entity_schema": ENTITY_SCHEMA_JSON,
+}
+
+# Tools whose result depends only on entity_id (when given) and the entity's analysis
+ENTITY_CACHED_TOOLS = frozenset({"analyze_method", "get_entity_details"})
+
+
+class CodeRAGTools:
+    """Tools for code analysis and search"""
+    
+    # Class-level cache: (tool, entity_id) -> (version, serialized result).
+    # Re-analysis replaces the Analysis row (new id) and re-indexing recreates
+    # entities, so an unchanged analysis id and dependency fingerprint (see
+    # _cached_entity_result) mean the cached result is current.
+    _result_cache: "OrderedDict[Tuple[str, int], Tuple[tuple, str]]" = OrderedDict()
+    _result_cache_lock = threading.Lock()
+    RESULT_CACHE_SIZE = 4096
+    
+    def __init__(self):
+        self.search_service = SearchService()
+        # Tool name -> handler(db, arguments) returning the JSON result
+        self._handlers = {
+            "search_code": self._search_code,
+            "analyze_method": self._analyze_method,
+            "get_refactoring_suggestions": self._get_refactoring_suggestions,
+            "get_similar_code": self._get_similar_code,
+            "get_entity_details": self._get_entity_details,
+            "list_projects": self._list_projects,
+            "get_project_info": self._get_project_info,
+        }
+    
+    async def get_tools(self) -> List[Dict[str, Any]]:
+        """Get list of available tools"""
+        return TOOLS
     
     async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
         """Call a tool by name with arguments"""
+        static_result = STATIC_TOOL_RESULTS.get(name)
+        if static_result is not None:
+            return static_result
+        
+        # Tools use the sync DB session and search service; running them in a
+        # worker thread keeps concurrent MCP requests from blocking the event loop
+        return await asyncio.to_thread(self._run_tool, name, arguments)
+    
+    def _run_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        
         db = SessionLocal()
         try:
-            if name == "search_code":
-                return await self._search_code(db, arguments)
-            elif name == "analyze_method":
-                return await self._analyze_method(db, arguments)
-            elif name == "get_refactoring_suggestions":
-                return await self._get_refactoring_suggestions(db, arguments)
-            elif name == "get_similar_code":
-                return await self._get_similar_code(db, arguments)
-            elif name == "get_entity_details":
-                return await self._get_entity_details(db, arguments)
-            elif name == "list_projects":
-                return await self._list_projects(db)
-            elif name == "get_project_info":
-                return await self._get_project_info(db, arguments)
-            elif name == "get_capabilities":
-                return await self._get_capabilities()
-            elif name == "get_entity_schema":
-                return await self._get_entity_schema()
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            entity_id = arguments.get("entity_id")
+            if name in ENTITY_CACHED_TOOLS and entity_id:
+                return self._cached_entity_result(db, name, entity_id, lambda: handler(db, arguments))
+            return handler(db, arguments)
         finally:
             db.close()
     
-    async def _search_code(self, db, args: Dict[str, Any]) -> str:
+    def _cached_entity_result(self, db, name: str, entity_id: int, build: Callable[[], str]) -> str:
+        """Return a cached entity tool result if the entity's analysis and dependencies are unchanged
+        
+        Validation is one query on the analysis.entity_id and dependency entity_id
+        indexes. Dependencies are fingerprinted by count and the sum of resolved
+        targets, since reindexing a target file deletes (SET NULL) or recreates
+        the target entities. Entities without analysis are not cached, since a
+        deleted entity looks the same.
+        """
+        row = db.query(
+            Analysis.id, func.count(Dependency.id), func.sum(Dependency.depends_on_entity_id)
+        ).outerjoin(
+            Dependency, Dependency.entity_id == Analysis.entity_id
+        ).filter(Analysis.entity_id == entity_id).group_by(Analysis.id).first()
+        version = tuple(row) if row is not None else None
+        key = (name, entity_id)
+        if version is not None:
+            with self._result_cache_lock:
+                cached = self._result_cache.get(key)
+                if cached is not None and cached[0] == version:
+                    self._result_cache.move_to_end(key)
+                    return cached[1]
+        
+        result = build()
+        if version is not None:
+            with self._result_cache_lock:
+                self._result_cache[key] = (version, result)
+                self._result_cache.move_to_end(key)
+                if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+        return result
+    
+    def _search_code(self, db, args: Dict[str, Any]) -> str:
         """Search code"""
         query = args.get("query", "")
         project_id = args.get("project_id")
         limit = min(args.get("limit", 10), 50)
         
         if not query:
-            return json.dumps({"error": "Query is required"}, indent=2)
+            return _dumps({"error": "Query is required"})
         
         results = self.search_service.search(
             db=db,
@@ -222,31 +489,29 @@ class CodeRAGTools:
             limit=limit
         )
         
-        formatted_results = []
-        for result in results:
-            entity = result.entity
-            analysis = result.analysis
-            
-            formatted_results.append({
-                "entity_id": entity.id,
-                "name": entity.name,
-                "type": entity.type,
-                "file_path": entity.file_path,
-                "start_line": entity.start_line,
-                "end_line": entity.end_line,
-                "description": analysis.description if analysis else "No analysis available",
-                "complexity": analysis.complexity if analysis else None,
+        formatted_results = [
+            {
+                "entity_id": result.entity.id,
+                "name": result.entity.name,
+                "type": result.entity.type,
+                "file_path": result.entity.file_path,
+                "start_line": result.entity.start_line,
+                "end_line": result.entity.end_line,
+                "description": result.analysis.description if result.analysis else NO_ANALYSIS_DESCRIPTION,
+                "complexity": result.analysis.complexity if result.analysis else None,
                 "score": result.score,
                 "match_type": result.match_type
-            })
+            }
+            for result in results
+        ]
         
-        return json.dumps({
+        return _dumps({
             "query": query,
             "total": len(formatted_results),
             "results": formatted_results
-        }, indent=2)
+        })
     
-    async def _analyze_method(self, db, args: Dict[str, Any]) -> str:
+    def _analyze_method(self, db, args: Dict[str, Any]) -> str:
         """Analyze a method/class/function"""
         entity_id = args.get("entity_id")
         file_path = args.get("file_path")
@@ -255,25 +520,24 @@ class CodeRAGTools:
         
         entity = None
         
+        # Entity, its file and analysis in one query
         if entity_id:
-            entity = db.query(Entity).filter(Entity.id == entity_id).first()
+            entity = db.get(Entity, entity_id, options=[joinedload(Entity.file), joinedload(Entity.analysis)])
         elif file_path and entity_name and project_id:
-            # Find entity by file path and name
-            file = db.query(File).join(Project).filter(
+            # Find entity by file path and name (files.project_id + path probe idx_file_project_path)
+            entity = db.query(Entity).join(Entity.file).options(
+                contains_eager(Entity.file), joinedload(Entity.analysis)
+            ).filter(
+                File.project_id == project_id,
                 File.path == file_path,
-                Project.id == project_id
+                Entity.name == entity_name
             ).first()
-            if file:
-                entity = db.query(Entity).filter(
-                    Entity.file_id == file.id,
-                    Entity.name == entity_name
-                ).first()
         
         if not entity:
-            return json.dumps({"error": "Entity not found"}, indent=2)
+            return _dumps({"error": "Entity not found"})
         
-        file = db.query(File).filter(File.id == entity.file_id).first()
-        analysis = db.query(Analysis).filter(Analysis.entity_id == entity.id).first()
+        file = entity.file
+        analysis = entity.analysis
         
         result = {
             "entity": {
@@ -292,34 +556,34 @@ class CodeRAGTools:
                 "description": analysis.description,
                 "complexity": analysis.complexity,
                 "complexity_explanation": analysis.complexity_explanation,
-                "solid_violations": analysis.solid_violations or [],
-                "design_patterns": analysis.design_patterns or [],
+                "solid_violations": analysis.solid_violations,
+                "design_patterns": analysis.design_patterns,
                 "ddd_role": analysis.ddd_role,
                 "mvc_role": analysis.mvc_role,
                 "is_testable": analysis.is_testable,
                 "testability_score": analysis.testability_score,
-                "testability_issues": analysis.testability_issues or [],
+                "testability_issues": analysis.testability_issues,
                 "lines_of_code": analysis.lines_of_code,
                 "cyclomatic_complexity": analysis.cyclomatic_complexity,
                 "cognitive_complexity": analysis.cognitive_complexity,
-                "security_issues": analysis.security_issues or [],
-                "n_plus_one_queries": analysis.n_plus_one_queries or []
+                "security_issues": analysis.security_issues,
+                "n_plus_one_queries": analysis.n_plus_one_queries
             }
         else:
             result["analysis"] = None
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
     
-    async def _get_refactoring_suggestions(self, db, args: Dict[str, Any]) -> str:
+    def _get_refactoring_suggestions(self, db, args: Dict[str, Any]) -> str:
         """Get refactoring suggestions"""
         entity_id = args.get("entity_id")
         similarity_threshold = args.get("similarity_threshold", 0.7)
         
-        entity = db.query(Entity).filter(Entity.id == entity_id).first()
+        entity = db.get(Entity, entity_id, options=[joinedload(Entity.analysis)]) if entity_id else None
         if not entity:
-            return json.dumps({"error": "Entity not found"}, indent=2)
+            return _dumps({"error": "Entity not found"})
         
-        analysis = db.query(Analysis).filter(Analysis.entity_id == entity_id).first()
+        analysis = entity.analysis
         
         suggestions = {
             "entity_id": entity_id,
@@ -341,41 +605,50 @@ class CodeRAGTools:
         # Similar code (simplified - would need to call similar code endpoint)
         # For now, just return SOLID violations
         
-        return json.dumps(suggestions, indent=2)
+        return _dumps(suggestions)
     
-    async def _get_similar_code(self, db, args: Dict[str, Any]) -> str:
+    def _get_similar_code(self, db, args: Dict[str, Any]) -> str:
         """Get similar code patterns"""
         entity_id = args.get("entity_id")
         project_id = args.get("project_id")
         limit = min(args.get("limit", 5), 20)
         
-        entity = db.query(Entity).filter(Entity.id == entity_id).first()
+        entity = db.get(Entity, entity_id) if entity_id else None
         if not entity:
-            return json.dumps({"error": "Entity not found"}, indent=2)
+            return _dumps({"error": "Entity not found"})
         
         # This would need to call the similar code search endpoint
         # For now, return a placeholder
-        return json.dumps({
+        return _dumps({
             "entity_id": entity_id,
             "message": "Similar code search requires implementation of similarity algorithm",
             "note": "Use get_refactoring_suggestions for refactoring opportunities"
-        }, indent=2)
+        })
     
-    async def _get_entity_details(self, db, args: Dict[str, Any]) -> str:
+    def _get_entity_details(self, db, args: Dict[str, Any]) -> str:
         """Get full entity details"""
         entity_id = args.get("entity_id")
         
-        entity = db.query(Entity).filter(Entity.id == entity_id).first()
+        # Entity with file and analysis joined; dependencies in one follow-up IN query
+        entity = db.get(Entity, entity_id, options=[
+            joinedload(Entity.file),
+            joinedload(Entity.analysis),
+            selectinload(Entity.dependencies)
+        ]) if entity_id else None
         
         if not entity:
-            return json.dumps({"error": "Entity not found"}, indent=2)
+            return _dumps({"error": "Entity not found"})
         
-        file = db.query(File).filter(File.id == entity.file_id).first()
-        analysis = db.query(Analysis).filter(Analysis.entity_id == entity_id).first()
+        file = entity.file
+        analysis = entity.analysis
+        dependencies = entity.dependencies
         
-        # Get dependencies
-        from app.models.database import Dependency
-        dependencies = db.query(Dependency).filter(Dependency.entity_id == entity_id).all()
+        # Names and types of resolved dependency targets, in one IN query
+        target_ids = {dep.depends_on_entity_id for dep in dependencies if dep.depends_on_entity_id}
+        targets = {
+            target.id: target
+            for target in db.query(Entity.id, Entity.name, Entity.type).filter(Entity.id.in_(target_ids))
+        } if target_ids else {}
         
         result = {
             "entity": {
@@ -392,7 +665,9 @@ class CodeRAGTools:
                 {
                     "type": dep.type,
                     "depends_on_name": dep.depends_on_name,
-                    "depends_on_entity_id": dep.depends_on_entity_id
+                    "depends_on_entity_id": dep.depends_on_entity_id,
+                    "target_name": targets[dep.depends_on_entity_id].name if dep.depends_on_entity_id in targets else None,
+                    "target_type": targets[dep.depends_on_entity_id].type if dep.depends_on_entity_id in targets else None
                 }
                 for dep in dependencies
             ]
@@ -403,13 +678,13 @@ class CodeRAGTools:
                 "description": analysis.description,
                 "complexity": analysis.complexity,
                 "complexity_explanation": analysis.complexity_explanation,
-                "solid_violations": analysis.solid_violations or [],
-                "design_patterns": analysis.design_patterns or [],
+                "solid_violations": analysis.solid_violations,
+                "design_patterns": analysis.design_patterns,
                 "ddd_role": analysis.ddd_role,
                 "mvc_role": analysis.mvc_role,
                 "is_testable": analysis.is_testable,
                 "testability_score": analysis.testability_score,
-                "testability_issues": analysis.testability_issues or [],
+                "testability_issues": analysis.testability_issues,
                 "metrics": {
                     "lines_of_code": analysis.lines_of_code,
                     "cyclomatic_complexity": analysis.cyclomatic_complexity,
@@ -418,8 +693,8 @@ class CodeRAGTools:
                     "parameter_count": analysis.parameter_count,
                     "coupling_score": analysis.coupling_score,
                     "cohesion_score": analysis.cohesion_score,
-                    "security_issues": analysis.security_issues or [],
-                    "n_plus_one_queries": analysis.n_plus_one_queries or [],
+                    "security_issues": analysis.security_issues,
+                    "n_plus_one_queries": analysis.n_plus_one_queries,
                     "is_god_object": analysis.is_god_object,
                     "feature_envy_score": analysis.feature_envy_score,
                     "long_parameter_list": analysis.long_parameter_list
@@ -428,11 +703,22 @@ class CodeRAGTools:
         else:
             result["analysis"] = None
         
-        return json.dumps(result, indent=2)
+        return _dumps(result)
     
-    async def _list_projects(self, db) -> str:
-        """List all projects"""
-        projects = db.query(Project).all()
+    def _list_projects(self, db, args: Dict[str, Any]) -> str:
+        """List projects, one keyset page at a time"""
+        after_id = args.get("after_id") or 0
+        # inputSchema declares 1..500, but clients may send 0, negatives or null
+        limit = max(1, min(int(args.get("limit") or 100), 500))
+        
+        # Only the listed columns are selected and hydrated; one extra row tells
+        # whether another page follows
+        projects = db.query(Project).options(load_only(
+            Project.id, Project.name, Project.path, Project.language, Project.total_files,
+            Project.indexed_files, Project.total_entities, Project.is_indexing
+        )).filter(Project.id > after_id).order_by(Project.id).limit(limit + 1).all()
+        has_more = len(projects) > limit
+        projects = projects[:limit]
         
         result = []
         for project in projects:
@@ -447,27 +733,32 @@ class CodeRAGTools:
                 "is_indexing": project.is_indexing
             })
         
-        return json.dumps({"projects": result}, indent=2)
+        return _dumps({
+            "projects": result,
+            "next_cursor": projects[-1].id if has_more and projects else None
+        })
     
-    async def _get_project_info(self, db, args: Dict[str, Any]) -> str:
+    def _get_project_info(self, db, args: Dict[str, Any]) -> str:
         """Get detailed information about a project"""
         project_id = args.get("project_id")
         
         if not project_id:
-            return json.dumps({"error": "project_id is required"}, indent=2)
+            return _dumps({"error": "project_id is required"})
         
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = db.get(Project, project_id)
         
         if not project:
-            return json.dumps({"error": f"Project with ID {project_id} not found"}, indent=2)
-        
-        # Get file count
-        file_count = db.query(func.count(File.id)).filter(File.project_id == project_id).scalar() or 0
-        
-        # Get entity count
-        entity_count = db.query(func.count(Entity.id)).join(File).filter(
-            File.project_id == project_id
-        ).scalar() or 0
+            return _dumps({"error": f"Project with ID {project_id} not found"})
+        
+        # Counts are only needed when the project's stored statistics are missing
+        file_count = entity_count = 0
+        if not (project.total_files and project.indexed_files and project.total_entities):
+            # File and entity counts in one grouped query
+            file_count, entity_count = db.query(
+                func.count(func.distinct(File.id)), func.count(Entity.id)
+            ).select_from(File).outerjoin(Entity, Entity.file_id == File.id).filter(
+                File.project_id == project_id
+            ).one()
         
         result = {
             "id": project.id,
@@ -479,194 +770,8 @@ class CodeRAGTools:
             "total_entities": project.total_entities or entity_count,
             "is_indexing": project.is_indexing,
             "tokens_used": project.tokens_used or 0,
-            "created_at": project.created_at.isoformat() if project.created_at else None,
-            "updated_at": project.updated_at.isoformat() if project.updated_at else None
+            "created_at": project.created_at,
+            "updated_at": project.updated_at
         }
         
-        return json.dumps(result, indent=2)
-    
-    async def _get_capabilities(self) -> str:
-        """Get information about available capabilities and tools"""
-        capabilities = {
-            "system": "Goose - AI-ассистент для анализа кода в системе CodeRAG",
-            "description": "Я помогаю отвечать на вопросы о кодовой базе, используя различные инструменты для поиска и анализа кода.",
-            "available_tools": [
-                {
-                    "name": "search_code",
-                    "description": "Поиск кода по естественному языку",
-                    "capabilities": [
-                        "Находит методы, классы, функции, константы, enum-ы",
-                        "Поддерживает семантический поиск по описаниям и коду",
-                        "Ищет по ключевым словам и синонимам"
-                    ],
-                    "example_questions": [
-                        "какой таймаут отправки письма?",
-                        "какие статусы есть для email?",
-                        "найди методы для отправки сообщений",
-                        "классы с высокой сложностью"
-                    ]
-                },
-                {
-                    "name": "get_entity_details",
-                    "description": "Получение детальной информации о сущности",
-                    "capabilities": [
-                        "Анализ конкретного класса, метода, функции или константы",
-                        "Получение метрик сложности, описания, зависимостей",
-                        "Просмотр полного кода сущности"
-                    ],
-                    "example_questions": [
-                        "расскажи про класс EmailService",
-                        "что делает метод sendEmail?",
-                        "детали константы EMAIL_SEND_TIMEOUT"
-                    ]
-                },
-                {
-                    "name": "analyze_method",
-                    "description": "Детальный анализ метода/класса/функции",
-                    "capabilities": [
-                        "Анализ сложности (O-нотация, цикломатическая, когнитивная)",
-                        "Выявление нарушений SOLID принципов",
-                        "Определение паттернов проектирования",
-                        "Оценка тестируемости и проблем безопасности"
-                    ],
-                    "example_questions": [
-                        "проанализируй метод sendWelcomeEmail",
-                        "какая сложность у этого класса?",
-                        "есть ли нарушения SOLID?"
-                    ]
-                },
-                {
-                    "name": "get_refactoring_suggestions",
-                    "description": "Предложения по рефакторингу",
-                    "capabilities": [
-                        "Поиск похожих паттернов кода",
-                        "Выявление нарушений SOLID принципов",
-                        "Рекомендации по улучшению кода"
-                    ],
-                    "example_questions": [
-                        "как можно улучшить этот метод?",
-                        "есть ли похожий код для рефакторинга?"
-                    ]
-                },
-                {
-                    "name": "get_similar_code",
-                    "description": "Поиск похожего кода",
-                    "capabilities": [
-                        "Находит похожие методы и классы по отпечатку кода",
-                        "Помогает найти дублирование",
-                        "Выявляет возможности для рефакторинга"
-                    ],
-                    "example_questions": [
-                        "найди похожий код",
-                        "есть ли дублирование?"
-                    ]
-                },
-                {
-                    "name": "list_projects",
-                    "description": "Список проиндексированных проектов",
-                    "capabilities": [
-                        "Показывает все проекты с их статусом",
-                        "Статистика: количество файлов, сущностей",
-                        "Информация о языке и пути проекта"
-                    ],
-                    "example_questions": [
-                        "какие проекты есть?",
-                        "покажи список проектов"
-                    ]
-                },
-                {
-                    "name": "get_project_info",
-                    "description": "Информация о конкретном проекте",
-                    "capabilities": [
-                        "Детали проекта: путь, язык, статус индексации",
-                        "Статистика: количество файлов и сущностей",
-                        "Информация о последней индексации"
-                    ],
-                    "example_questions": [
-                        "информация о проекте с ID 3",
-                        "статус индексации проекта"
-                    ]
-                }
-            ],
-            "what_i_can_do": [
-                "Отвечать на вопросы о функциональности кода",
-                "Находить конкретные константы, методы, классы",
-                "Объяснять, как работает код",
-                "Предлагать улучшения и рефакторинг",
-                "Анализировать сложность и качество кода",
-                "Искать похожие паттерны в кодовой базе",
-                "Определять нарушения SOLID принципов",
-                "Оценивать тестируемость кода",
-                "Выявлять проблемы безопасности"
-            ]
-        }
-        return json.dumps(capabilities, indent=2, ensure_ascii=False)
-    
-    async def _get_entity_schema(self) -> str:
-        """Get detailed schema of Entity and Analysis data structures"""
-        schema = {
-            "description": "Структура данных о сущностях кода (Entity) и их анализе (Analysis). Эта информация помогает понять, какие данные доступны и как по ним можно искать.",
-            "entity": {
-                "description": "Базовая информация о сущности кода (класс, метод, функция, константа, enum)",
-                "fields": {
-                    "id": {"type": "integer", "description": "Уникальный идентификатор сущности"},
-                    "type": {"type": "string", "description": "Тип сущности: 'class', 'method', 'function', 'constant', 'enum'", "searchable": True, "example_queries": ["найди все классы", "покажи методы", "найди константы"]},
-                    "name": {"type": "string", "description": "Имя сущности", "searchable": True, "example_queries": ["найди EmailService", "метод sendEmail"]},
-                    "full_qualified_name": {"type": "string", "description": "Полное квалифицированное имя (например, 'ClassName.method_name')", "searchable": True},
-                    "file_path": {"type": "string", "description": "Путь к файлу относительно корня проекта", "searchable": True},
-                    "start_line": {"type": "integer", "description": "Номер строки начала"},
-                    "end_line": {"type": "integer", "description": "Номер строки конца"},
-                    "visibility": {"type": "string", "description": "Видимость: 'public', 'private', 'protected'", "searchable": True},
-                    "code": {"type": "string", "description": "Полный код сущности", "searchable": True}
-                }
-            },
-            "analysis": {
-                "description": "Детальный анализ сущности с метриками, сложностью, архитектурными ролями и т.д.",
-                "fields": {
-                    "description": {"type": "string", "description": "Описание функциональности сущности (2-3 предложения)", "searchable": True, "example_queries": ["найди код для отправки email", "что делает метод отправки"]},
-                    "complexity": {"type": "string", "description": "Временная сложность в O-нотации: 'O(1)', 'O(log n)', 'O(n)', 'O(n log n)', 'O(n^2)', 'O(n^3)', 'O(2^n)', 'O(n!)'", "searchable": True, "example_queries": ["найди методы со сложностью O(n^2)", "классы с O(n!) сложностью", "методы со сложностью NP"]},
-                    "complexity_numeric": {"type": "float", "description": "Числовое значение сложности для сортировки: 1=O(1), 2=O(log n), 3=O(n), 4=O(n log n), 5=O(n^2), 6=O(n^3), 7=O(2^n), 8=O(n!)", "searchable": True, "range_queries": True},
-                    "complexity_explanation": {"type": "string", "description": "Объяснение почему такая сложность"},
-                    "ddd_role": {"type": "string", "description": "Роль в Domain-Driven Design: 'Entity', 'ValueObject', 'Aggregate', 'Service', 'Repository', 'Factory' и т.д.", "searchable": True, "example_queries": ["найди все Repository", "покажи Entity в DDD", "какие Service есть?"]},
-                    "mvc_role": {"type": "string", "description": "Роль в MVC архитектуре: 'Controller', 'Model', 'View', 'Service', 'Repository' и т.д.", "searchable": True, "example_queries": ["найди все Controller", "покажи Model классы", "какие Service есть?"]},
-                    "design_patterns": {"type": "array", "description": "Список паттернов проектирования (например, ['Factory', 'Strategy', 'Observer'])", "searchable": True, "example_queries": ["найди код с паттерном Factory", "где используется Strategy?"]},
-                    "solid_violations": {"type": "array", "description": "Список нарушений SOLID принципов", "searchable": True, "example_queries": ["найди нарушения Single Responsibility", "где нарушается Liskov Substitution?"]},
-                    "is_testable": {"type": "boolean", "description": "Можно ли тестировать", "searchable": True},
-                    "testability_score": {"type": "float", "description": "Оценка тестируемости (0.0-1.0)", "searchable": True, "range_queries": True},
-                    "testability_issues": {"type": "array", "description": "Проблемы с тестируемостью"},
-                    "lines_of_code": {"type": "integer", "description": "Количество строк кода", "searchable": True, "range_queries": True},
-                    "cyclomatic_complexity": {"type": "integer", "description": "Цикломатическая сложность", "searchable": True, "range_queries": True, "example_queries": ["найди методы с высокой цикломатической сложностью"]},
-                    "cognitive_complexity": {"type": "integer", "description": "Когнитивная сложность", "searchable": True, "range_queries": True},
-                    "max_nesting_depth": {"type": "integer", "description": "Максимальная глубина вложенности", "searchable": True, "range_queries": True},
-                    "parameter_count": {"type": "integer", "description": "Количество параметров", "searchable": True, "range_queries": True},
-                    "coupling_score": {"type": "float", "description": "Оценка связанности (0.0-1.0)", "searchable": True, "range_queries": True},
-                    "cohesion_score": {"type": "float", "description": "Оценка связности (0.0-1.0)", "searchable": True, "range_queries": True},
-                    "afferent_coupling": {"type": "integer", "description": "Входящие зависимости (сколько классов зависят от этого)", "searchable": True, "range_queries": True},
-                    "efferent_coupling": {"type": "integer", "description": "Исходящие зависимости (от скольких классов зависит)", "searchable": True, "range_queries": True},
-                    "space_complexity": {"type": "string", "description": "Пространственная сложность (например, 'O(1)', 'O(n)')", "searchable": True},
-                    "n_plus_one_queries": {"type": "array", "description": "Список N+1 запросов к БД", "searchable": True, "example_queries": ["найди код с N+1 проблемой"]},
-                    "hot_path_detected": {"type": "boolean", "description": "Обнаружен ли hot path (часто выполняемый код)", "searchable": True},
-                    "security_issues": {"type": "array", "description": "Проблемы безопасности", "searchable": True, "example_queries": ["найди проблемы безопасности", "где есть уязвимости?"]},
-                    "hardcoded_secrets": {"type": "array", "description": "Хардкоженные секреты", "searchable": True},
-                    "insecure_dependencies": {"type": "array", "description": "Небезопасные зависимости", "searchable": True},
-                    "is_god_object": {"type": "boolean", "description": "Является ли God Object (слишком много ответственности)", "searchable": True, "example_queries": ["найди God Objects"]},
-                    "feature_envy_score": {"type": "float", "description": "Оценка Feature Envy (0.0-1.0)", "searchable": True, "range_queries": True},
-                    "data_clumps": {"type": "array", "description": "Группы данных, которые часто используются вместе", "searchable": True},
-                    "long_parameter_list": {"type": "boolean", "description": "Длинный список параметров", "searchable": True},
-                    "keywords": {"type": "string", "description": "Ключевые слова для семантического поиска (синонимы, связанные термины)", "searchable": True}
-                }
-            },
-            "search_guidelines": {
-                "description": "Как правильно формулировать поисковые запросы",
-                "tips": [
-                    "Для поиска по сложности используйте: 'найди методы со сложностью O(n^2)', 'классы с O(n!) сложностью', 'методы со сложностью NP'",
-                    "Для поиска по DDD ролям: 'найди все Repository', 'покажи Entity в DDD', 'какие Service есть?'",
-                    "Для поиска по MVC ролям: 'найди все Controller', 'покажи Model классы', 'какие Service есть?'",
-                    "Для поиска по паттернам: 'найди код с паттерном Factory', 'где используется Strategy?'",
-                    "Для поиска по метрикам: 'найди методы с высокой цикломатической сложностью', 'классы с низкой тестируемостью'",
-                    "Для поиска по проблемам: 'найди нарушения SOLID', 'найди God Objects', 'найди код с N+1 проблемой'",
-                    "Система автоматически распознает эти паттерны в запросах и применяет соответствующие фильтры"
-                ]
-            }
-        }
-        return json.dumps(schema, indent=2, ensure_ascii=False)
\ No newline at end of file
+        return _dumps(result)
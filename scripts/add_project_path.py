@@ -1,12 +1,125 @@
 #!/usr/bin/env python3
 """
 Script to add project path mount to docker-compose.yml
-Uses text-based approach to preserve file structure
+Edits the YAML tree with ruamel.yaml round-trip mode when it is installed
+(comments, order and quoting are preserved); otherwise falls back to a
+text-based edit that also leaves the rest of the file untouched
 """
 import os
+import re
+import subprocess
 import sys
 from pathlib import Path
 
+try:
+    from ruamel.yaml import YAML
+except ImportError:
+    YAML = None
+
+# Services that need the project mounts
+SERVICES = frozenset({'backend', 'celery_worker'})
+
+# Host path of a short-syntax volume entry ("- /host/path:/container/path:ro")
+VOLUME_ENTRY = re.compile(r'^\s*-\s*["\']?([^:\s"\']+):')
+
+# Mapping key that opens a block ("backend:", "volumes:  # comment")
+BLOCK_KEY = re.compile(r'^\s*([\w.-]+):\s*(?:#.*)?$')
+
+
+def _insert_mount(lines: list, services: frozenset, mount_line: str):
+    """Add mount_line to the volumes of the given services in one pass over lines
+    
+    The mount goes after the last entry of each service's volumes list (or right
+    after "volumes:" if the list is empty). Returns (new_lines, modified).
+    """
+    insert_after = []  # indexes in lines to put mount_line after, in order
+    in_services = False
+    service_indent = None  # indent of service names under "services:"
+    current_service = None
+    in_volumes = False
+    volumes_indent = 0
+    last_volume_idx = -1
+    
+    def close_volumes():
+        nonlocal in_volumes
+        if in_volumes:
+            insert_after.append(last_volume_idx)
+            in_volumes = False
+    
+    for idx, line in enumerate(lines):
+        # One lstrip per line gives blankness, comment marker and indent
+        content = line.lstrip()
+        first = content[:1]
+        
+        # Blank lines and comments don't end a section
+        if not first or first == '#':
+            continue
+        
+        indent = len(line) - len(content)
+        match = BLOCK_KEY.match(line)
+        key = match.group(1) if match else None
+        
+        # Volumes list ends at the next key of the service (or anything shallower)
+        if in_volumes and indent <= volumes_indent:
+            close_volumes()
+        
+        if indent == 0:
+            # Top-level key: "services:" starts the service definitions
+            current_service = None
+            in_services = key == 'services'
+            service_indent = None
+        elif in_services:
+            if service_indent is None:
+                service_indent = indent
+            if indent == service_indent:
+                # Service header: track it only if it needs the mount
+                current_service = key if key in services else None
+            elif current_service and key == 'volumes':
+                in_volumes = True
+                volumes_indent = indent
+        
+        if in_volumes:
+            # Last line of the volumes list so far ("volumes:" itself if empty)
+            last_volume_idx = idx
+    
+    close_volumes()
+    
+    # Merge the mounts in with one append pass (no list.insert shifting)
+    new_lines = []
+    pending = iter(insert_after)
+    next_insert = next(pending, None)
+    for idx, line in enumerate(lines):
+        new_lines.append(line)
+        if idx == next_insert:
+            new_lines.append(mount_line)
+            next_insert = next(pending, None)
+    return new_lines, bool(insert_after)
+
+
+def _add_mount_structured(compose_file: Path, services: frozenset, volume: str) -> bool:
+    """Append volume to the volumes list of the given services via ruamel.yaml
+    
+    Like the text-based edit, only services that already have a volumes list
+    are changed. Returns True if the file was modified.
+    """
+    yaml = YAML(typ='rt')
+    yaml.preserve_quotes = True
+    yaml.indent(mapping=2, sequence=4, offset=2)  # docker-compose.yml layout
+    yaml.width = 4096  # don't re-wrap long command lines
+    data = yaml.load(compose_file)
+    
+    modified = False
+    for name in services:
+        service = (data.get('services') or {}).get(name) or {}
+        volumes = service.get('volumes')
+        if volumes is not None and volume not in volumes:
+            volumes.append(volume)
+            modified = True
+    
+    if modified:
+        yaml.dump(data, compose_file)
+    return modified
+
 
 def add_mount_to_compose(base_path: str):
     """Add volume mount to docker-compose.yml"""
@@ -25,102 +138,37 @@ def add_mount_to_compose(base_path: str):
         sys.exit(1)
     
     # Read docker-compose.yml
-    with open(compose_file, 'r') as f:
-        lines = f.readlines()
-    
-    # Check if path is already mounted
-    if any(abs_path in line for line in lines):
+    text = compose_file.read_text()
+    lines = text.splitlines(keepends=True)
+    
+    # Check if path is already mounted (exact host path, so /foo doesn't match /foobar);
+    # the volume entries are only parsed if the path occurs in the file at all
+    if f"{abs_path}:" in text and abs_path in {
+        match.group(1) for line in lines if (match := VOLUME_ENTRY.match(line))
+    }:
         print(f"Path {abs_path} is already mounted in docker-compose.yml")
         return
     
-    # Services that need the mount
-    services = ['backend', 'celery_worker']
-    mount_line = f"      - {abs_path}:{abs_path}:ro\n"
-    new_lines = []
-    i = 0
-    modified = False
-    
-    while i < len(lines):
-        line = lines[i]
-        new_lines.append(line)
-        
-        # Check if we're entering a service that needs mounting
-        for service_name in services:
-            if line.strip() == f"{service_name}:":
-                # Look for volumes section in this service
-                j = i + 1
-                in_volumes = False
-                last_volume_idx = -1
-                
-                while j < len(lines):
-                    next_line = lines[j]
-                    stripped = next_line.strip()
-                    
-                    # Stop if we hit next top-level service/key (not indented)
-                    if stripped and not next_line.startswith(' ') and not next_line.startswith('\t'):
-                        if ':' in stripped and not stripped.startswith('#'):
-                            break
-                    
-                    # Found volumes: line
-                    if 'volumes:' in next_line:
-                        in_volumes = True
-                        new_lines.append(next_line)
-                        j += 1
-                        continue
-                    
-                    # If we're in volumes section
-                    if in_volumes:
-                        # Check if this is a volume line (starts with -)
-                        if stripped.startswith('-'):
-                            new_lines.append(next_line)
-                            last_volume_idx = len(new_lines) - 1
-                            j += 1
-                            continue
-                        elif stripped and not stripped.startswith('#'):
-                            # End of volumes section, insert mount before this line
-                            if last_volume_idx >= 0:
-                                new_lines.insert(last_volume_idx + 1, mount_line)
-                                modified = True
-                            in_volumes = False
-                            new_lines.append(next_line)
-                            j += 1
-                            continue
-                        # Empty line or comment
-                        new_lines.append(next_line)
-                        j += 1
-                        continue
-                    
-                    new_lines.append(next_line)
-                    j += 1
-                
-                # If we found volumes but didn't insert yet, add at the end
-                if in_volumes:
-                    if last_volume_idx >= 0:
-                        new_lines.insert(last_volume_idx + 1, mount_line)
-                    else:
-                        # No volumes yet, add after volumes: line
-                        new_lines.append(mount_line)
-                    modified = True
-                
-                i = j
-                break
-        
-        i += 1
+    if YAML is not None:
+        modified = _add_mount_structured(compose_file, SERVICES, f"{abs_path}:{abs_path}:ro")
+    else:
+        new_lines, modified = _insert_mount(lines, SERVICES, f"      - {abs_path}:{abs_path}:ro\n")
+        if modified:
+            # Write back to file
+            compose_file.write_text("".join(new_lines))
     
     if not modified:
         print("Warning: Could not find volumes sections for target services")
         return
     
-    # Write back to file
-    with open(compose_file, 'w') as f:
-        f.writelines(new_lines)
-    
-    # Validate docker-compose file
-    exit_code = os.system("docker-compose config > /dev/null 2>&1")
-    if exit_code != 0:
-        print("Error: docker-compose.yml is invalid after modification!")
-        print("Please check the file manually or restore from git")
-        sys.exit(1)
+    # Validate the text edit; a structured edit only appended a string to an
+    # existing volumes list of a file ruamel.yaml parsed, so it can't break it
+    if YAML is None:
+        result = subprocess.run(["docker-compose", "config"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            print("Error: docker-compose.yml is invalid after modification!")
+            print("Please check the file manually or restore from git")
+            sys.exit(1)
     
     print(f"✓ Added mount: {abs_path} -> {abs_path} (read-only)")
     print(f"✓ Updated docker-compose.yml")
@@ -128,12 +176,12 @@ def add_mount_to_compose(base_path: str):
     print("Restarting containers...")
     
     # Restart containers
-    exit_code = os.system("docker-compose down > /dev/null 2>&1")
-    if exit_code != 0:
+    result = subprocess.run(["docker-compose", "down"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
         print("Warning: docker-compose down failed")
     
-    exit_code = os.system("docker-compose up -d")
-    if exit_code != 0:
+    result = subprocess.run(["docker-compose", "up", "-d"])
+    if result.returncode != 0:
         print("Error: docker-compose up failed")
         sys.exit(1)
     